@@ -0,0 +1,317 @@
+"""CSC111 Winter 2021: Project Phase 2
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students and Faculty
+involved in CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited.
+
+This file is Copyright (c) 2021 Shayaan Khan, Markus Nimi, Matthew Chan and Aabid Anas.
+
+Benchmarks of the game engine, the game tree and training.
+
+Running this file times each benchmark, compares the results with a JSON baseline file and
+exits with a nonzero status if any benchmark is slower than the baseline by more than the
+regression threshold, or if importing the headless modules takes longer than the startup
+budget or loads any plotting or GUI module:
+
+    python benchmarks.py --threshold 0.2
+    python benchmarks.py --update-baseline
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+import numpy as np
+
+import connect3
+import gametree
+import runner
+
+DEFAULT_BASELINE_FILE = 'benchmark_baseline.json'
+# The fraction by which a benchmark may be slower than the baseline before it fails
+DEFAULT_THRESHOLD = 0.2
+# Each benchmark is run this many times and the fastest run is kept, to reduce noise
+DEFAULT_REPEATS = 3
+
+# The modules used by headless training, and the maximum number of seconds it may take to
+# import them in a new process
+HEADLESS_MODULES = ['connect3', 'gametree', 'runner']
+DEFAULT_STARTUP_BUDGET = 0.5
+# Modules that importing HEADLESS_MODULES must not load
+GUI_MODULES = ['plotly', 'pygame', 'tkinter']
+
+_IMPORT_TIME_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {modules}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds,
+                  'loaded': [m for m in {gui_modules!r} if m in sys.modules]}}))
+"""
+
+
+def _build_tree(tree: gametree.GameTree, winners: list[str], move_sequences: list[list[int]],
+                player_selection: str) -> None:
+    """Insert the given games into tree, scored in the same way as run_learning_algorithm."""
+    for winner, moves in zip(winners, move_sequences):
+        tree.insert_move_sequence(moves, connect3.score_game(winner, player_selection))
+
+
+def _count_nodes(tree: gametree.GameTree) -> int:
+    """Return the number of nodes in the given tree."""
+    return 1 + sum(_count_nodes(subtree) for subtree in tree.get_subtrees())
+
+
+def benchmark_tree_memory(games: int, player_selection: str = 'Red') -> dict[str, float]:
+    """Insert the same games of random play into a GameTree and a CompactGameTree, and return
+    the number of nodes and the memory used per node by each tree.
+
+    Preconditions:
+        - player_selection in {'Red', 'Yellow'}
+    """
+    winners, move_sequences = connect3.run_random_games(games)
+
+    tracemalloc.start()
+    object_tree = gametree.GameTree(player_selection)
+    _build_tree(object_tree, winners, move_sequences, player_selection)
+    object_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    compact_tree = gametree.CompactGameTree(player_selection)
+    _build_tree(compact_tree, winners, move_sequences, player_selection)
+    compact_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    nodes = _count_nodes(object_tree)
+    results = {'nodes': nodes,
+               'object_bytes_per_node': object_bytes / nodes,
+               'compact_bytes_per_node': compact_bytes / nodes}
+
+    print('========== GameTree memory (' + str(games) + ' games, ' + str(nodes)
+          + ' nodes) ==========')
+    print('GameTree: ' + str(round(results['object_bytes_per_node'], 1)) + ' bytes per node')
+    print('CompactGameTree: ' + str(round(results['compact_bytes_per_node'], 1))
+          + ' bytes per node')
+    return results
+
+
+def _random_move_sequences(games: int) -> list[list[int]]:
+    """Return the moves of the given number of games of random play, always the same ones."""
+    return connect3.run_random_games(games, np.random.default_rng(111))[1]
+
+
+def benchmark_make_move(games: int = 2000) -> float:
+    """Return the number of Connect3Game.make_move calls per second, each followed by
+    get_winner (and so _is_winning_move), when replaying games of random play.
+    """
+    move_sequences = _random_move_sequences(games)
+    moves = sum(len(sequence) for sequence in move_sequences)
+
+    start = time.perf_counter()
+    for sequence in move_sequences:
+        game = connect3.Connect3Game()
+        for move in sequence:
+            game.make_move(move)
+            game.get_winner()
+    return moves / (time.perf_counter() - start)
+
+
+def benchmark_run_game(games: int = 1000) -> float:
+    """Return the number of games per second played by run_game between two RandomPlayers."""
+    random.seed(111)
+    start = time.perf_counter()
+    for _ in range(games):
+        connect3.run_game(connect3.RandomPlayer(), connect3.RandomPlayer())
+    return games / (time.perf_counter() - start)
+
+
+def benchmark_insert_move_sequence(games: int = 20000) -> float:
+    """Return the number of GameTree.insert_move_sequence calls per second when inserting
+    whole games of random play into a new tree, so that it grows to its full depth.
+    """
+    move_sequences = _random_move_sequences(games)
+    tree = gametree.GameTree('Red')
+
+    start = time.perf_counter()
+    for moves in move_sequences:
+        tree.insert_move_sequence(moves, 0.5)
+    return games / (time.perf_counter() - start)
+
+
+def benchmark_insert_many(games: int = 20000) -> float:
+    """Return the number of games per second inserted by GameTree.insert_many, with the same
+    games as benchmark_insert_move_sequence.
+    """
+    move_sequences = _random_move_sequences(games)
+    tree = gametree.GameTree('Red')
+
+    start = time.perf_counter()
+    tree.insert_many((moves, 0.5) for moves in move_sequences)
+    return games / (time.perf_counter() - start)
+
+
+def benchmark_exploring_player(games: int = 1000) -> float:
+    """Return the number of ExploringPlayer.make_move calls per second for a player that
+    always follows a trained tree, playing as Yellow against a RandomPlayer.
+    """
+    tree = gametree.GameTree('Red')
+    winners, move_sequences = connect3.run_random_games(20000, np.random.default_rng(111))
+    _build_tree(tree, winners, move_sequences, 'Red')
+
+    random.seed(111)
+    moves = 0
+    elapsed = 0.0
+    for _ in range(games):
+        game = connect3.Connect3Game()
+        yellow = connect3.ExploringPlayer(tree, 0.0)
+        red = connect3.RandomPlayer()
+        previous_move = None
+        while game.get_winner() is None:
+            if game.is_yellow_move():
+                start = time.perf_counter()
+                previous_move = yellow.make_move(game, previous_move)
+                elapsed += time.perf_counter() - start
+                moves += 1
+            else:
+                previous_move = red.make_move(game, previous_move)
+            game.make_move(previous_move)
+    return moves / elapsed
+
+
+def benchmark_learning_algorithm(games: int = 5000) -> float:
+    """Return the number of games per second trained by run_learning_algorithm, with the same
+    schedule as runner.runner_train_and_play.
+    """
+    # run_learning_algorithm prints its results, which are not needed here
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        runner.run_learning_algorithm(runner.train_and_play_probabilities(games), 'Red',
+                                      show_stats=False, seed=111)
+    return games / (time.perf_counter() - start)
+
+
+def benchmark_import_time(repeats: int = DEFAULT_REPEATS) -> tuple[float, list[str]]:
+    """Return the fastest time in seconds to import HEADLESS_MODULES in a new Python process,
+    and the modules in GUI_MODULES that importing them loaded.
+
+    Preconditions:
+        - repeats >= 1
+    """
+    script = _IMPORT_TIME_SCRIPT.format(modules=', '.join(HEADLESS_MODULES),
+                                        gui_modules=GUI_MODULES)
+    fastest = None
+    loaded = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', script], capture_output=True, check=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        result = json.loads(output.stdout)
+        if fastest is None or result['seconds'] < fastest:
+            fastest = result['seconds']
+        loaded = result['loaded']
+    return fastest, loaded
+
+
+# Each benchmark returns a number of operations per second, so higher is better
+BENCHMARKS: dict[str, Callable[[], float]] = {
+    'make_move_per_second': benchmark_make_move,
+    'run_game_per_second': benchmark_run_game,
+    'insert_move_sequence_per_second': benchmark_insert_move_sequence,
+    'insert_many_per_second': benchmark_insert_many,
+    'exploring_player_moves_per_second': benchmark_exploring_player,
+    'learning_games_per_second': benchmark_learning_algorithm
+}
+
+
+def run_benchmarks(repeats: int = DEFAULT_REPEATS) -> dict[str, float]:
+    """Run every benchmark in BENCHMARKS the given number of times, and return the best
+    result of each.
+
+    Preconditions:
+        - repeats >= 1
+    """
+    return {name: max(benchmark() for _ in range(repeats))
+            for name, benchmark in BENCHMARKS.items()}
+
+
+def find_regressions(results: dict[str, float], baseline: dict[str, float],
+                     threshold: float) -> list[str]:
+    """Return the names of the benchmarks whose result is more than threshold (as a fraction)
+    below their baseline. Benchmarks missing from the baseline are ignored.
+    """
+    return [name for name in results
+            if name in baseline and results[name] < baseline[name] * (1 - threshold)]
+
+
+def main(arguments: list[str]) -> int:
+    """Run the benchmarks with the given command line arguments, and return the exit status:
+    1 if any benchmark regressed, otherwise 0.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the Connect3 engine and training.')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_FILE,
+                        help='the JSON file containing the baseline results')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='the fraction by which a benchmark may be slower than its baseline')
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS,
+                        help='the number of times each benchmark is run')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='save the results as the new baseline')
+    parser.add_argument('--memory', action='store_true',
+                        help='also report the memory used per game tree node')
+    parser.add_argument('--startup-budget', type=float, default=DEFAULT_STARTUP_BUDGET,
+                        help='the maximum number of seconds to import the headless modules')
+    args = parser.parse_args(arguments)
+
+    results = run_benchmarks(args.repeats)
+    if args.memory:
+        benchmark_tree_memory(100000)
+
+    import_seconds, loaded_gui_modules = benchmark_import_time(args.repeats)
+    print('========== Startup ==========')
+    print('Import ' + ', '.join(HEADLESS_MODULES) + ': ' + str(round(1000 * import_seconds, 1))
+          + ' ms (budget ' + str(round(1000 * args.startup_budget, 1)) + ' ms)')
+    startup_failed = import_seconds > args.startup_budget or loaded_gui_modules != []
+    if import_seconds > args.startup_budget:
+        print('REGRESSION: importing the headless modules is over the startup budget')
+    for module in loaded_gui_modules:
+        print('REGRESSION: importing the headless modules loads ' + module)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    print('========== Benchmarks (operations per second) ==========')
+    for name, result in results.items():
+        line = name + ': ' + str(round(result, 1))
+        if name in baseline:
+            line += ' (baseline ' + str(round(baseline[name], 1)) + ', ' \
+                    + str(round(100 * (result / baseline[name] - 1), 1)) + '%)'
+        print(line)
+
+    if args.update_baseline or baseline == {}:
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=4)
+        print('Saved the results as the baseline in ' + args.baseline)
+        return 1 if startup_failed else 0
+
+    regressions = find_regressions(results, baseline, args.threshold)
+    for name in regressions:
+        print('REGRESSION: ' + name + ' is more than ' + str(100 * args.threshold)
+              + '% slower than the baseline')
+    return 1 if regressions or startup_failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -11,15 +11,45 @@ expressly prohibited.
 This file is Copyright (c) 2021 Shayaan Khan, Markus Nimi, Matthew Chan and Aabid Anas."""
 
 from __future__ import annotations
+import copy
+import math
 import random
-from typing import Optional
+import time
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Iterable, Optional
 import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from gametree import GameTree
+from gametree import GameTree, ZOBRIST_KEYS, ZOBRIST_RED_TO_MOVE, CENTRE_COLUMN, \
+    COLUMN_COUNT, ROW_COUNT, mirror_move
 
-ROW_COUNT = 4
-COLUMN_COUNT = 5
+WINDOW_LENGTH = 3
+
+# Increase this whenever a change to the game or the players changes the trees that are
+# learned, so that trees cached by treecache are not reused
+ENGINE_VERSION = 1
+
+
+def _build_windows() -> list[tuple[tuple[int, int], ...]]:
+    """Return every horizontal, vertical and diagonal line of WINDOW_LENGTH cells on the board,
+    where each cell is a (row, column) pair.
+    """
+    windows = []
+    for r in range(ROW_COUNT):
+        for c in range(COLUMN_COUNT):
+            # Horizontal, vertical, positively sloped and negatively sloped lines starting at (r, c)
+            for dr, dc in [(0, 1), (1, 0), (1, 1), (-1, 1)]:
+                end_r = r + dr * (WINDOW_LENGTH - 1)
+                end_c = c + dc * (WINDOW_LENGTH - 1)
+                if 0 <= end_r < ROW_COUNT and 0 <= end_c < COLUMN_COUNT:
+                    windows.append(tuple((r + dr * i, c + dc * i) for i in range(WINDOW_LENGTH)))
+    return windows
+
+
+# ALL_WINDOWS contains every line on the board, and WINDOWS_THROUGH_CELL[r][c] contains
+# the lines that pass through the cell (r, c)
+ALL_WINDOWS = _build_windows()
+WINDOWS_THROUGH_CELL = [[[window for window in ALL_WINDOWS if (r, c) in window]
+                         for c in range(COLUMN_COUNT)] for r in range(ROW_COUNT)]
 
 
 ################################################################################
@@ -43,6 +73,15 @@ class Player:
         """
         raise NotImplementedError
 
+    def ponder(self, game: Connect3Game) -> None:
+        """Start thinking about the replies to the opponent's possible moves in game, while
+        the opponent is choosing its move. Players that do not ponder do nothing.
+
+        Preconditions:
+            - it is the opponent's turn in game
+        """
+        return None
+
 
 class RandomPlayer(Player):
     """A Connect3 AI whose strategy is always picking a random move."""
@@ -65,15 +104,56 @@ class ExploringPlayer(Player):
 
     _exploration_probability is a value between 0 and 1, where 1 corresponds to a completely
     random player, and 0 corresponds to an optimal player.
+
+    If the game tree is transposition-aware, the player finds the current position in it by
+    its Zobrist key before every move, so it can keep using the tree after an unexpected move
+    as long as the resulting position has been seen before.
+
+    If the game tree is mirror-symmetric, the player decides the orientation of the game from
+    its first move outside the centre column, and maps moves to and from the tree's canonical
+    orientation.
     """
 
     _game_tree: Optional[GameTree]
     _exploration_probability: float
+    _transposition_root: Optional[GameTree]
+    # Private Instance Attributes:
+    #   - _symmetric: whether the game tree is mirror-symmetric
+    #   - _mirrored: whether this game is the mirror image of the canonical orientation, or
+    #     None if every move so far was in the centre column
+    _symmetric: bool
+    _mirrored: Optional[bool]
 
     def __init__(self, game_tree: GameTree, exploration_probability: float) -> None:
         """Initialize this player."""
         self._game_tree = game_tree
         self._exploration_probability = exploration_probability
+        if game_tree is not None and game_tree.has_transpositions():
+            self._transposition_root = game_tree
+        else:
+            self._transposition_root = None
+        self._symmetric = game_tree is not None and game_tree.is_symmetric()
+        self._mirrored = None
+
+    def _to_tree_move(self, move: int) -> int:
+        """Return the move in the game tree's orientation corresponding to the given move on
+        the board, deciding the orientation of the game if it is not decided yet.
+        """
+        if not self._symmetric:
+            return move
+        elif self._mirrored is None and move != CENTRE_COLUMN:
+            # The canonical orientation has its first move outside the centre on the left
+            self._mirrored = move > CENTRE_COLUMN
+        return mirror_move(move) if self._mirrored else move
+
+    def _from_tree_move(self, tree_move: int) -> int:
+        """Return the move on the board corresponding to the given move in the game tree's
+        orientation, deciding the orientation of the game if it is not decided yet.
+        """
+        if self._symmetric and self._mirrored is None:
+            # Every move in the tree's orientation is also a move on the board
+            self._to_tree_move(tree_move)
+        return mirror_move(tree_move) if self._mirrored else tree_move
 
     def make_move(self, game: Connect3Game, previous_move: Optional[int]) -> int:
         """Make a move given the current game.
@@ -85,16 +165,21 @@ class ExploringPlayer(Player):
             - There is at least one valid move for the given game
         """
         # First update self._game_tree
-        if previous_move is None or self._game_tree is None:
+        if self._transposition_root is not None:
+            # Look the position up directly, however it was reached
+            self._game_tree = self._transposition_root.get_subtree_by_position(
+                game.get_position_key())
+        elif previous_move is None or self._game_tree is None:
             # White's first move or the game tree is already none
             pass
         elif self._game_tree.get_subtrees() == [] or \
-                self._game_tree.get_subtree_by_move(previous_move) is None:
+                self._game_tree.get_subtree_by_move(self._to_tree_move(previous_move)) is None:
             # We are at a leaf, or the move wasn't expected, or the game tree was already None
             self._game_tree = None
         else:
             # A previous move was given and exists as a subtree
-            self._game_tree = self._game_tree.get_subtree_by_move(previous_move)
+            self._game_tree = self._game_tree.get_subtree_by_move(
+                self._to_tree_move(previous_move))
 
         # Pick a move
         if self._game_tree is None or self._game_tree.get_subtrees() == [] or \
@@ -104,15 +189,294 @@ class ExploringPlayer(Player):
             possible_moves = game.get_valid_moves()
             chosen_move = random.choice(possible_moves)
             if self._game_tree is not None:
-                self._game_tree = self._game_tree.get_subtree_by_move(chosen_move)
+                self._game_tree = self._game_tree.get_subtree_by_move(
+                    self._to_tree_move(chosen_move))
 
             return chosen_move
         else:
             # Pick the best move from its subtrees
-            best_subtree = self._game_tree.get_optimal_subtree()
-            chosen_move = best_subtree.move
-            self._game_tree = best_subtree
+            tree_move = self._game_tree.get_optimal_move()
+            self._game_tree = self._game_tree.get_subtree_by_move(tree_move)
+            return self._from_tree_move(tree_move)
+
+
+class MinimaxPlayer(Player):
+    """A Connect3 AI that plays perfectly by solving the game with a Connect3Solver.
+
+    It wins as quickly as possible when it can force a win, and otherwise draws or loses as
+    slowly as possible.
+    """
+    # Private instance attributes:
+    #   - _solver: the solver used to pick moves, whose cache is kept between moves and games
+
+    _solver: Connect3Solver
+
+    def __init__(self, solver: Optional[Connect3Solver] = None) -> None:
+        """Initialize this player, sharing the given solver if one is given."""
+        if solver is None:
+            solver = Connect3Solver()
+        self._solver = solver
+
+    def make_move(self, game: Connect3Game, previous_move: Optional[int]) -> int:
+        """Make a move given the current game.
+
+        previous_move is the opponent player's most recent move, or None if no moves
+        have been made.
+
+        Preconditions:
+            - There is at least one valid move for the given game
+        """
+        return self._solver.get_best_move(game)
+
+
+class MCTSPlayer(Player):
+    """A Connect3 AI that picks moves with Monte Carlo Tree Search (UCT).
+
+    Before each move it runs random playouts from the current position until its time or
+    playout budget runs out, and plays the most visited move. At least one playout is run
+    for every move, even if the budget allows none, so that there is always a move to play.
+    The search tree is kept between moves: the subtree for the opponent's previous_move
+    becomes the new root.
+    """
+    # Private instance attributes:
+    #   - _time_limit: the maximum number of seconds to search for each move, or None
+    #   - _playouts: the maximum number of playouts for each move, or None
+    #   - _exploration: the exploration constant of the UCT formula
+    #   - _root: the search tree node of the position after this player's last move, or None
+
+    _time_limit: Optional[float]
+    _playouts: Optional[int]
+    _exploration: float
+    _root: Optional[_MCTSNode]
+
+    def __init__(self, time_limit: Optional[float] = 0.5, playouts: Optional[int] = None,
+                 exploration: float = math.sqrt(2)) -> None:
+        """Initialize this player with the given budget for each move. The search stops as
+        soon as either budget runs out.
+
+        Preconditions:
+            - time_limit is not None or playouts is not None
+        """
+        self._time_limit = time_limit
+        self._playouts = playouts
+        self._exploration = exploration
+        self._root = None
+
+    def make_move(self, game: Connect3Game, previous_move: Optional[int]) -> int:
+        """Make a move given the current game.
+
+        previous_move is the opponent player's most recent move, or None if no moves
+        have been made.
+
+        Preconditions:
+            - There is at least one valid move for the given game
+        """
+        current, mask, moves = _game_to_bitboards(game)
+        root = None
+        if self._root is not None and previous_move is not None:
+            root = self._root.children.get(previous_move)
+        if root is None or root.current != current or root.mask != mask:
+            # The position is not in the search tree, so start a new one
+            root = _MCTSNode(current, mask, moves)
+
+        deadline = None if self._time_limit is None else time.perf_counter() + self._time_limit
+        # The first playout expands a child of root, so there is always a move to choose
+        self._run_playout(root)
+        playouts = 1
+        while (self._playouts is None or playouts < self._playouts) \
+                and (deadline is None or time.perf_counter() < deadline):
+            self._run_playout(root)
+            playouts += 1
+
+        chosen_move = max(root.children, key=lambda move: root.children[move].visits)
+        self._root = root.children[chosen_move]
+        return chosen_move
+
+    def _run_playout(self, root: _MCTSNode) -> None:
+        """Select a path from root with UCT, expand one new node, finish the game with random
+        moves and record the result along the path.
+        """
+        node = root
+        path = [root]
+        while not node.is_terminal and node.untried_moves == [] and node.children:
+            log_visits = math.log(node.visits)
+            node = max(node.children.values(),
+                       key=lambda child: child.total_reward / child.visits
+                       + self._exploration * math.sqrt(log_visits / child.visits))
+            path.append(node)
+
+        if not node.is_terminal:
+            move = node.untried_moves.pop(random.randrange(len(node.untried_moves)))
+            node = node.add_child(move)
+            path.append(node)
+
+        # reward is the result for the player who made the move leading to each node
+        reward = node.simulate()
+        for path_node in reversed(path):
+            path_node.visits += 1
+            path_node.total_reward += reward
+            reward = 1.0 - reward
+
+
+class _MCTSNode:
+    """A node of the search tree of an MCTSPlayer.
+
+    Instance Attributes:
+        - current: the bitboard of the player to move
+        - mask: the bitboard of all discs
+        - moves: the number of moves made so far
+        - is_terminal: whether the game is over
+        - winner_moved_last: whether the game was won by the move leading to this node
+        - untried_moves: the valid moves without a child yet
+        - children: the children of this node, keyed by move
+        - visits: the number of playouts through this node
+        - total_reward: the total result of those playouts (1 for a win, 0.5 for a draw) for
+          the player who made the move leading to this node
+    """
+    current: int
+    mask: int
+    moves: int
+    is_terminal: bool
+    winner_moved_last: bool
+    untried_moves: list[int]
+    children: dict[int, _MCTSNode]
+    visits: int
+    total_reward: float
+
+    def __init__(self, current: int, mask: int, moves: int) -> None:
+        """Initialize a node for the given position."""
+        self.current = current
+        self.mask = mask
+        self.moves = moves
+        self.winner_moved_last = bitboard_has_three(mask ^ current)
+        self.is_terminal = self.winner_moved_last or moves == CELL_COUNT
+        if self.is_terminal:
+            self.untried_moves = []
+        else:
+            self.untried_moves = [c for c in range(COLUMN_COUNT)
+                                  if not mask & BITBOARD_TOP_MASKS[c]]
+        self.children = {}
+        self.visits = 0
+        self.total_reward = 0.0
+
+    def add_child(self, move: int) -> _MCTSNode:
+        """Add and return the child for the given move."""
+        move_bit = (self.mask + BITBOARD_BOTTOM_MASKS[move]) & BITBOARD_COLUMN_MASKS[move]
+        child = _MCTSNode(self.mask ^ self.current, self.mask | move_bit, self.moves + 1)
+        self.children[move] = child
+        return child
+
+    def simulate(self) -> float:
+        """Finish the game from this node with random moves and return the result for the
+        player who made the move leading to this node.
+        """
+        if self.winner_moved_last:
+            return 1.0
+        current, mask, moves = self.current, self.mask, self.moves
+        # The result is for the player to move in (current, mask); it flips after each move
+        result_is_flipped = False
+        while moves < CELL_COUNT:
+            columns = [c for c in range(COLUMN_COUNT) if not mask & BITBOARD_TOP_MASKS[c]]
+            c = random.choice(columns)
+            move_bit = (mask + BITBOARD_BOTTOM_MASKS[c]) & BITBOARD_COLUMN_MASKS[c]
+            if bitboard_has_three(current | move_bit):
+                # The player to move in (current, mask) won
+                return 1.0 if result_is_flipped else 0.0
+            current, mask = mask ^ current, mask | move_bit
+            moves += 1
+            result_is_flipped = not result_is_flipped
+        return 0.5
+
+
+class PonderingPlayer(Player):
+    """A Connect3 AI that plays like the given player, but ponders: while the opponent is
+    thinking, it computes its reply to each of the opponent's possible moves in a background
+    thread, so that make_move returns immediately if the opponent makes one of them.
+
+    Each reply is computed by a shallow copy of the player, which is then kept as the player
+    if its reply is used, so the player's state (such as an ExploringPlayer's position in its
+    tree) is the same as if it had not pondered. The copies share everything else, such as a
+    MinimaxPlayer's solver or an MCTSPlayer's search tree, which pondering then extends.
+    """
+    # Private instance attributes:
+    #   - _player: the player whose moves are played
+    #   - _executor: the thread computing the replies, or None if it has not been started
+    #   - _replies: the pending or computed reply to each position the opponent can reach,
+    #     keyed by the position's Zobrist key, together with the copy of _player computing it
+
+    _player: Player
+    _executor: Optional[ThreadPoolExecutor]
+    _replies: dict[int, tuple[Future, Player]]
+
+    def __init__(self, player: Player) -> None:
+        """Initialize this player, which plays like player."""
+        self._player = player
+        self._executor = None
+        self._replies = {}
+
+    def ponder(self, game: Connect3Game) -> None:
+        """Start computing the reply to each of the opponent's possible moves in game in the
+        background.
+
+        Preconditions:
+            - it is the opponent's turn in game
+        """
+        self.stop_pondering()
+        if game.get_winner() is not None:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+
+        for move in game.get_valid_moves():
+            next_game = copy.deepcopy(game)
+            next_game.make_move(move)
+            if next_game.get_winner() is None:
+                player = copy.copy(self._player)
+                self._replies[next_game.get_position_key()] = \
+                    (self._executor.submit(player.make_move, next_game, move), player)
+
+    def make_move(self, game: Connect3Game, previous_move: Optional[int]) -> int:
+        """Make a move given the current game, using the pondered reply if there is one.
+
+        previous_move is the opponent player's most recent move, or None if no moves
+        have been made.
+
+        The replies to the other positions are cancelled first. If the reply to this position
+        has not started yet, it is cancelled too and computed directly, so it never waits
+        behind the other replies. At most one other reply, the one already being computed,
+        is waited for.
+
+        Preconditions:
+            - There is at least one valid move for the given game
+        """
+        pondered = self._replies.pop(game.get_position_key(), None)
+        if pondered is not None and pondered[0].cancel():
+            pondered = None
+        self.stop_pondering()
+
+        if pondered is not None:
+            future, player = pondered
+            # Waits if the reply is still being computed
+            chosen_move = future.result()
+            self._player = player
             return chosen_move
+        return self._player.make_move(game, previous_move)
+
+    def stop_pondering(self) -> None:
+        """Cancel the replies that have not started, and wait for the one being computed, so
+        that no other thread uses the player's shared state.
+        """
+        for future, _ in self._replies.values():
+            future.cancel()
+        wait([future for future, _ in self._replies.values()])
+        self._replies = {}
+
+    def close(self) -> None:
+        """Stop pondering and stop the background thread."""
+        self.stop_pondering()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
 
 
 ################################################################################
@@ -127,11 +491,15 @@ class Connect3Game:
     #     where each element corresponds to the index of an available column.
     #   - _is_yellow_active: a boolean to check the active color.
     #   - _move_count: an integer for the number of moves so far
+    #   - _last_move_cell: the (row, column) filled by the last move, or None if unknown
+    #   - _position_key: the Zobrist key of the current position (see gametree.ZOBRIST_KEYS)
 
     _board: np.ndarray
     _valid_moves: list[int]
     _is_yellow_active: bool
     _move_count: int
+    _last_move_cell: Optional[tuple[int, int]]
+    _position_key: int
 
     def __init__(self, board: np.ndarray = None, yellow_active: bool = True) -> None:
         """Initialize an actual Connect3 game. This includes the game board, the possible moves
@@ -141,8 +509,11 @@ class Connect3Game:
             self._board = board
         else:
             self._board = np.zeros((ROW_COUNT, COLUMN_COUNT))
-        self._valid_moves = [0, 1, 2, 3, 4]
         self._is_yellow_active = yellow_active
+        self._move_count = int(np.count_nonzero(self._board))
+        self._last_move_cell = None
+        self._position_key = compute_position_key(self._board, yellow_active)
+        self.update_valid_moves()
 
     def get_valid_moves(self) -> list:
         """Return a list of valid moves for the active player.
@@ -158,11 +529,16 @@ class Connect3Game:
         """
         return self._is_yellow_active
 
+    def get_position_key(self) -> int:
+        """Return the Zobrist key of the current position.
+        """
+        return self._position_key
+
     def update_valid_moves(self) -> None:
         """Update self._valid_moves.
         """
         game_state = self._board
-        top_of_columns = game_state[3]
+        top_of_columns = game_state[ROW_COUNT - 1]
         self._valid_moves = [i for i in range(COLUMN_COUNT) if top_of_columns[i] == 0]
 
     def make_move(self, col: int) -> None:
@@ -172,13 +548,11 @@ class Connect3Game:
         Preconditions:
             - col in self._valid_moves
         """
-        self.update_valid_moves()
-
         if col in self._valid_moves:
             # The move is valid
             game_state = self._board
             lowest_row_for_col = 0
-            for i in range(0, 4):
+            for i in range(ROW_COUNT):
                 if game_state[i][col] == 0.0:
                     lowest_row_for_col = i
                     break
@@ -188,27 +562,35 @@ class Connect3Game:
             else:
                 val = 2
             self._board[lowest_row_for_col][col] = val
+            self._last_move_cell = (lowest_row_for_col, col)
+            self._position_key ^= ZOBRIST_KEYS[val - 1][lowest_row_for_col][col] \
+                ^ ZOBRIST_RED_TO_MOVE
+            self._move_count += 1
             self._is_yellow_active = not self._is_yellow_active
 
+            if lowest_row_for_col == ROW_COUNT - 1:
+                # The column is now full
+                self._valid_moves = [c for c in self._valid_moves if c != col]
+
     def get_winner(self) -> Optional[str]:
         """Returns the winner of the current game state.
 
         Return None if there is no winner
         """
-        if self._valid_moves == []:
-            return 'Draw'
-        elif self._is_winning_move():
+        if self._is_winning_move():
             # make_move() changes _is_yellow_active, so we are checking if the last player won
             return 'Red' if self._is_yellow_active else 'Yellow'
+        elif self._valid_moves == []:
+            return 'Draw'
         else:
             return None
 
     def _is_winning_move(self) -> bool:
-        """Check if the current player has 3 in a row somewhere and has won the game
+        """Check if the player who just moved has 3 in a row and has won the game
         Return True if so, False otherwise
 
-        Preconditions:
-            - piece == 1 or piece == 2
+        Only the lines through the last filled cell are checked. If the last move is unknown
+        (e.g. the game was created from an existing board), every line on the board is checked.
         """
         board = self._board
 
@@ -217,41 +599,408 @@ class Connect3Game:
         else:
             piece = 1
 
-        # Check horizontal locations for win
-        for c in range(0, COLUMN_COUNT - 2):
-            for r in range(ROW_COUNT):
-                if board[r][c] == piece and board[r][c + 1] == piece and board[r][c + 2] == piece:
-                    return True
+        if self._last_move_cell is None:
+            windows = ALL_WINDOWS
+        else:
+            r, c = self._last_move_cell
+            windows = WINDOWS_THROUGH_CELL[r][c]
 
-        # Check vertical locations for win
-        for c in range(COLUMN_COUNT):
-            for r in range(ROW_COUNT - 2):
-                if board[r][c] == piece and board[r + 1][c] == piece and board[r + 2][c] == piece:
-                    return True
-
-        # Check positively sloped diagonals
-        for c in range(COLUMN_COUNT - 2):
-            for r in range(ROW_COUNT - 2):
-                if board[r][c] == piece and board[r + 1][c + 1] == piece and \
-                        board[r + 2][c + 2] == piece:
-                    return True
-
-        # Check negatively sloped diagonals
-        for c in range(COLUMN_COUNT - 2):
-            for r in range(2, ROW_COUNT):
-                if board[r][c] == piece and board[r - 1][c + 1] == piece and \
-                        board[r - 2][c + 2] == piece:
-                    return True
+        for (r1, c1), (r2, c2), (r3, c3) in windows:
+            if board[r1][c1] == piece and board[r2][c2] == piece and board[r3][c3] == piece:
+                return True
 
         return False
 
 
-def run_game(yellow: Player, red: Player) -> tuple[str, list[int]]:
+def compute_position_key(board: np.ndarray, yellow_active: bool) -> int:
+    """Return the Zobrist key of the given board with the given player to move.
+
+    Games keep their key up to date in make_move, so this is only needed for a new game.
+    """
+    key = 0 if yellow_active else ZOBRIST_RED_TO_MOVE
+    for r in range(ROW_COUNT):
+        for c in range(COLUMN_COUNT):
+            if board[r][c] != 0:
+                key ^= ZOBRIST_KEYS[int(board[r][c]) - 1][r][c]
+    return key
+
+
+# Bit index of the cell (r, c) in a bitboard is c * BITBOARD_COLUMN_HEIGHT + r. Each column
+# has one spare (always empty) bit on top so that shifted lines never wrap into the next column.
+BITBOARD_COLUMN_HEIGHT = ROW_COUNT + 1
+BITBOARD_BOTTOM_MASKS = [1 << (c * BITBOARD_COLUMN_HEIGHT) for c in range(COLUMN_COUNT)]
+BITBOARD_TOP_MASKS = [1 << (c * BITBOARD_COLUMN_HEIGHT + ROW_COUNT - 1)
+                      for c in range(COLUMN_COUNT)]
+# Vertical, horizontal, negatively sloped and positively sloped directions
+BITBOARD_DIRECTIONS = [1, BITBOARD_COLUMN_HEIGHT, BITBOARD_COLUMN_HEIGHT - 1,
+                       BITBOARD_COLUMN_HEIGHT + 1]
+
+
+def bitboard_has_three(bits: int) -> bool:
+    """Return whether the given bitboard contains 3 discs in a row in any direction."""
+    for shift in BITBOARD_DIRECTIONS:
+        pairs = bits & (bits >> shift)
+        if pairs & (pairs >> shift):
+            return True
+    return False
+
+
+class BitboardConnect3Game:
+    """A Connect3 game that stores the board as two integer bitmasks instead of a numpy array.
+
+    This has the same public methods as Connect3Game, so it can be used by RandomPlayer,
+    ExploringPlayer and main.py without any changes. The numpy board is only built when
+    get_board is called.
+    """
+    # Private instance attributes:
+    #   - _yellow_bits: a bitmask of the cells containing a yellow disc
+    #   - _red_bits: a bitmask of the cells containing a red disc
+    #   - _heights: the number of discs in each column
+    #   - _valid_moves: a list of valid moves possible with the game state,
+    #     where each element corresponds to the index of an available column.
+    #   - _is_yellow_active: a boolean to check the active color.
+    #   - _move_count: an integer for the number of moves so far
+    #   - _winner: the colour of the player that has 3 in a row, or None
+    #   - _position_key: the Zobrist key of the current position (see gametree.ZOBRIST_KEYS)
+
+    _yellow_bits: int
+    _red_bits: int
+    _heights: list[int]
+    _valid_moves: list[int]
+    _is_yellow_active: bool
+    _move_count: int
+    _winner: Optional[str]
+    _position_key: int
+
+    def __init__(self, board: np.ndarray = None, yellow_active: bool = True) -> None:
+        """Initialize a Connect3 game, optionally starting from the given numpy board."""
+        self._yellow_bits = 0
+        self._red_bits = 0
+        self._heights = [0] * COLUMN_COUNT
+        if board is not None:
+            for c in range(COLUMN_COUNT):
+                for r in range(ROW_COUNT):
+                    if board[r][c] == 1:
+                        self._yellow_bits |= BITBOARD_BOTTOM_MASKS[c] << r
+                    elif board[r][c] == 2:
+                        self._red_bits |= BITBOARD_BOTTOM_MASKS[c] << r
+                    else:
+                        continue
+                    self._heights[c] = r + 1
+        self._is_yellow_active = yellow_active
+        self._move_count = sum(self._heights)
+        self.update_valid_moves()
+        if board is not None:
+            self._position_key = compute_position_key(board, yellow_active)
+        else:
+            self._position_key = 0 if yellow_active else ZOBRIST_RED_TO_MOVE
+
+        if bitboard_has_three(self._yellow_bits):
+            self._winner = 'Yellow'
+        elif bitboard_has_three(self._red_bits):
+            self._winner = 'Red'
+        else:
+            self._winner = None
+
+    def get_valid_moves(self) -> list:
+        """Return a list of valid moves for the active player.
+        """
+        return self._valid_moves
+
+    def get_board(self) -> np.ndarray:
+        """Return the board as a numpy array, in the same format as Connect3Game.get_board"""
+        board = np.zeros((ROW_COUNT, COLUMN_COUNT))
+        for c in range(COLUMN_COUNT):
+            for r in range(self._heights[c]):
+                if self._yellow_bits & (BITBOARD_BOTTOM_MASKS[c] << r):
+                    board[r][c] = 1
+                else:
+                    board[r][c] = 2
+        return board
+
+    def is_yellow_move(self) -> bool:
+        """Return whether the yellow player is to move next.
+        """
+        return self._is_yellow_active
+
+    def get_position_key(self) -> int:
+        """Return the Zobrist key of the current position.
+        """
+        return self._position_key
+
+    def update_valid_moves(self) -> None:
+        """Update self._valid_moves.
+
+        The valid moves are already kept up to date by make_move, so this is only needed
+        for compatibility with code written for Connect3Game.
+        """
+        occupied = self._yellow_bits | self._red_bits
+        self._valid_moves = [c for c in range(COLUMN_COUNT)
+                             if not occupied & BITBOARD_TOP_MASKS[c]]
+
+    def make_move(self, col: int) -> None:
+        """Place a disk for the current player in the specified column
+        Change self._is_yellow_active afterwards
+
+        Preconditions:
+            - col in self._valid_moves
+        """
+        if self._heights[col] >= ROW_COUNT:
+            # The column is full, so the move is ignored like in Connect3Game
+            return
+
+        cell = BITBOARD_BOTTOM_MASKS[col] << self._heights[col]
+        if self._is_yellow_active:
+            self._yellow_bits |= cell
+            self._position_key ^= ZOBRIST_KEYS[0][self._heights[col]][col]
+            if bitboard_has_three(self._yellow_bits):
+                self._winner = 'Yellow'
+        else:
+            self._red_bits |= cell
+            self._position_key ^= ZOBRIST_KEYS[1][self._heights[col]][col]
+            if bitboard_has_three(self._red_bits):
+                self._winner = 'Red'
+        self._position_key ^= ZOBRIST_RED_TO_MOVE
+
+        self._heights[col] += 1
+        if self._heights[col] == ROW_COUNT:
+            self._valid_moves = [c for c in self._valid_moves if c != col]
+        self._move_count += 1
+        self._is_yellow_active = not self._is_yellow_active
+
+    def get_winner(self) -> Optional[str]:
+        """Returns the winner of the current game state.
+
+        Return None if there is no winner
+        """
+        if self._winner is not None:
+            return self._winner
+        elif self._valid_moves == []:
+            return 'Draw'
+        else:
+            return None
+
+
+CELL_COUNT = ROW_COUNT * COLUMN_COUNT
+BITBOARD_COLUMN_MASKS = [((1 << ROW_COUNT) - 1) << (c * BITBOARD_COLUMN_HEIGHT)
+                         for c in range(COLUMN_COUNT)]
+# Columns closer to the centre usually take part in more lines, so they are searched first
+SOLVER_MOVE_ORDER = sorted(range(COLUMN_COUNT), key=lambda c: abs(2 * c - (COLUMN_COUNT - 1)))
+
+# Kinds of scores stored in the solver's transposition cache
+_EXACT = 0
+_LOWER_BOUND = 1
+_UPPER_BOUND = 2
+
+
+class Connect3Solver:
+    """An exact Connect3 solver using negamax search with alpha-beta pruning.
+
+    Scores are from the point of view of the player to move. A win on the n-th move of the
+    game (counting from 1) scores CELL_COUNT + 1 - n, so quicker wins score higher, a loss
+    scores the negative of the opponent's win, and a draw scores 0. The sign of a score is
+    the game-theoretic value of the position.
+
+    Positions are represented as a pair of bitboards (see BitboardConnect3Game): the discs of
+    the player to move and the mask of all discs.
+    """
+    # Private instance attributes:
+    #   - _cache: a transposition cache mapping the key of a position (current + mask, which
+    #     is unique because of the spare bit on top of each column) to a pair of the kind of
+    #     score (_EXACT, _LOWER_BOUND or _UPPER_BOUND) and the score
+    #   - _position_table: an optional mapping from Zobrist keys to exact scores, as returned
+    #     by solve_all_positions, which is used instead of searching when possible
+
+    _cache: dict[int, tuple[int, int]]
+    _position_table: Optional[dict[int, int]]
+
+    def __init__(self, position_table: Optional[dict[int, int]] = None) -> None:
+        """Initialize a solver with an empty cache, and the given position table if any."""
+        self._cache = {}
+        self._position_table = position_table
+
+    def solve(self, game: Connect3Game) -> int:
+        """Return the score of the given game for the player to move."""
+        if self._position_table is not None and game.get_position_key() in self._position_table:
+            return self._position_table[game.get_position_key()]
+
+        current, mask, moves = _game_to_bitboards(game)
+        if bitboard_has_three(mask ^ current):
+            # The previous player has already won
+            return -(CELL_COUNT + 1 - moves)
+        return self._negamax(current, mask, moves, -CELL_COUNT, CELL_COUNT)
+
+    def get_value(self, game: Connect3Game) -> int:
+        """Return the game-theoretic value of the given game for the player to move: 1 if they
+        can force a win, 0 if the best they can force is a draw and -1 otherwise.
+        """
+        score = self.solve(game)
+        return (score > 0) - (score < 0)
+
+    def get_best_move(self, game: Connect3Game) -> int:
+        """Return a move with the best score for the player to move. Ties are broken in
+        favour of the column closest to the centre.
+
+        Preconditions:
+            - game.get_winner() is None
+        """
+        current, mask, moves = _game_to_bitboards(game)
+        best_move = None
+        best_score = -CELL_COUNT - 1
+        for c in SOLVER_MOVE_ORDER:
+            if mask & BITBOARD_TOP_MASKS[c]:
+                continue
+            move_bit = (mask + BITBOARD_BOTTOM_MASKS[c]) & BITBOARD_COLUMN_MASKS[c]
+            if bitboard_has_three(current | move_bit):
+                return c
+            score = -self._negamax(mask ^ current, mask | move_bit, moves + 1,
+                                   -CELL_COUNT, -best_score)
+            if score > best_score:
+                best_move, best_score = c, score
+        return best_move
+
+    def solve_all_positions(self) -> dict[int, int]:
+        """Return a mapping from the Zobrist key (see gametree.ZOBRIST_KEYS) of every position
+        reachable from the empty board where the game is not over to its exact score.
+        """
+        table = {}
+        self._solve_all(0, 0, 0, [0] * COLUMN_COUNT, 0, {}, table)
+        return table
+
+    def _solve_all(self, current: int, mask: int, moves: int, heights: list[int],
+                   position_key: int, scores: dict[int, int], table: dict[int, int]) -> int:
+        """Return the exact score of the given position without alpha-beta pruning, and add
+        it and every position reachable from it to table.
+
+        scores maps the bitboard keys of the positions solved so far to their scores.
+        """
+        key = current + mask
+        if key in scores:
+            return scores[key]
+
+        if moves == CELL_COUNT:
+            best_score = 0
+        else:
+            best_score = -CELL_COUNT - 1
+            piece_index = moves % 2
+            for c in SOLVER_MOVE_ORDER:
+                if mask & BITBOARD_TOP_MASKS[c]:
+                    continue
+                move_bit = (mask + BITBOARD_BOTTOM_MASKS[c]) & BITBOARD_COLUMN_MASKS[c]
+                if bitboard_has_three(current | move_bit):
+                    best_score = max(best_score, CELL_COUNT - moves)
+                    continue
+                child_key = position_key ^ ZOBRIST_KEYS[piece_index][heights[c]][c] \
+                    ^ ZOBRIST_RED_TO_MOVE
+                heights[c] += 1
+                score = -self._solve_all(mask ^ current, mask | move_bit, moves + 1, heights,
+                                         child_key, scores, table)
+                heights[c] -= 1
+                best_score = max(best_score, score)
+
+        scores[key] = best_score
+        table[position_key] = best_score
+        return best_score
+
+    def _negamax(self, current: int, mask: int, moves: int, alpha: int, beta: int) -> int:
+        """Return the score of the given position, if it is strictly between alpha and beta.
+
+        Otherwise, return an upper bound of the score if it is at most alpha, or a lower
+        bound of the score if it is at least beta.
+
+        Preconditions:
+            - the previous player has not won
+        """
+        if moves == CELL_COUNT:
+            return 0
+
+        # Check for an immediate win before anything else
+        for c in SOLVER_MOVE_ORDER:
+            if not mask & BITBOARD_TOP_MASKS[c]:
+                move_bit = (mask + BITBOARD_BOTTOM_MASKS[c]) & BITBOARD_COLUMN_MASKS[c]
+                if bitboard_has_three(current | move_bit):
+                    return CELL_COUNT - moves
+
+        key = current + mask
+        entry = self._cache.get(key)
+        if entry is not None:
+            kind, score = entry
+            if kind == _EXACT:
+                return score
+            elif kind == _LOWER_BOUND:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if alpha >= beta:
+                return score
+
+        original_alpha = alpha
+        best_score = -CELL_COUNT - 1
+        for c in SOLVER_MOVE_ORDER:
+            if mask & BITBOARD_TOP_MASKS[c]:
+                continue
+            move_bit = (mask + BITBOARD_BOTTOM_MASKS[c]) & BITBOARD_COLUMN_MASKS[c]
+            score = -self._negamax(mask ^ current, mask | move_bit, moves + 1, -beta, -alpha)
+            if score > best_score:
+                best_score = score
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        if best_score <= original_alpha:
+            self._cache[key] = (_UPPER_BOUND, best_score)
+        elif best_score >= beta:
+            self._cache[key] = (_LOWER_BOUND, best_score)
+        else:
+            self._cache[key] = (_EXACT, best_score)
+        return best_score
+
+
+def _game_to_bitboards(game: Connect3Game) -> tuple[int, int, int]:
+    """Return the bitboard of the player to move, the bitboard of all discs and the number
+    of moves made in the given game.
+    """
+    board = game.get_board()
+    current_piece = 1 if game.is_yellow_move() else 2
+    current = 0
+    mask = 0
+    moves = 0
+    for c in range(COLUMN_COUNT):
+        for r in range(ROW_COUNT):
+            if board[r][c] != 0:
+                bit = BITBOARD_BOTTOM_MASKS[c] << r
+                mask |= bit
+                moves += 1
+                if board[r][c] == current_piece:
+                    current |= bit
+    return current, mask, moves
+
+
+def save_position_table(table: dict[int, int], path: str) -> None:
+    """Save a table returned by Connect3Solver.solve_all_positions to the file at path, as a
+    numpy .npz file.
+    """
+    np.savez(path, keys=np.fromiter(table.keys(), dtype=np.uint64, count=len(table)),
+             scores=np.fromiter(table.values(), dtype=np.int8, count=len(table)))
+
+
+def load_position_table(path: str) -> dict[int, int]:
+    """Return the table saved to the file at path by save_position_table."""
+    with np.load(path) as data:
+        return dict(zip(data['keys'].tolist(), data['scores'].tolist()))
+
+
+def run_game(yellow: Player, red: Player, use_bitboard: bool = False) -> tuple[str, list[int]]:
     """Run a Connect3 game between the two given players.
 
-    Return the winner and list of moves made in the game.
+    Return the winner and list of moves made in the game. If use_bitboard is True, the game
+    is played on a BitboardConnect3Game instead of a Connect3Game.
     """
-    game = Connect3Game()
+    if use_bitboard:
+        game = BitboardConnect3Game()
+    else:
+        game = Connect3Game()
 
     move_sequence = []
     previous_move = None
@@ -270,42 +1019,243 @@ def run_game(yellow: Player, red: Player) -> tuple[str, list[int]]:
     return game.get_winner(), move_sequence
 
 
+def _build_padded_cell_windows() -> tuple[np.ndarray, np.ndarray]:
+    """Return the rows and columns of WINDOWS_THROUGH_CELL as two arrays of shape
+    (ROW_COUNT, COLUMN_COUNT, max windows through a cell, WINDOW_LENGTH).
+
+    Cells with fewer windows are padded by repeating their first window, which does not
+    change whether any of them is complete.
+    """
+    max_windows = max(len(WINDOWS_THROUGH_CELL[r][c])
+                      for r in range(ROW_COUNT) for c in range(COLUMN_COUNT))
+    rows = np.zeros((ROW_COUNT, COLUMN_COUNT, max_windows, WINDOW_LENGTH), dtype=np.intp)
+    cols = np.zeros((ROW_COUNT, COLUMN_COUNT, max_windows, WINDOW_LENGTH), dtype=np.intp)
+    for r in range(ROW_COUNT):
+        for c in range(COLUMN_COUNT):
+            windows = WINDOWS_THROUGH_CELL[r][c]
+            for i in range(max_windows):
+                window = windows[i] if i < len(windows) else windows[0]
+                rows[r, c, i] = [cell[0] for cell in window]
+                cols[r, c, i] = [cell[1] for cell in window]
+    return rows, cols
+
+
+CELL_WINDOW_ROWS, CELL_WINDOW_COLS = _build_padded_cell_windows()
+
+
+def run_random_games(num_games: int, rng: Optional[np.random.Generator] = None) \
+        -> tuple[list[str], list[list[int]]]:
+    """Run num_games Connect3 games between two random players at the same time.
+
+    All games are stored in one (num_games, ROW_COUNT, COLUMN_COUNT) array and advanced in
+    lockstep: each step picks a uniformly random valid move for every unfinished game and
+    checks the lines through the new discs with array operations.
+
+    Return the winners and the move sequences of the games, in the same format as run_game,
+    so that they can be passed straight to GameTree.insert_move_sequence.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    boards = np.zeros((num_games, ROW_COUNT, COLUMN_COUNT), dtype=np.int8)
+    heights = np.zeros((num_games, COLUMN_COUNT), dtype=np.int8)
+    moves = np.zeros((num_games, ROW_COUNT * COLUMN_COUNT), dtype=np.int8)
+    lengths = np.full(num_games, ROW_COUNT * COLUMN_COUNT)
+    winners = np.full(num_games, 'Draw', dtype=object)
+    active = np.arange(num_games)
+
+    for step in range(ROW_COUNT * COLUMN_COUNT):
+        if active.size == 0:
+            break
+        piece = 1 if step % 2 == 0 else 2
+
+        # The largest random key among the valid columns is a uniformly random valid move
+        keys = rng.random((active.size, COLUMN_COUNT))
+        keys[heights[active] >= ROW_COUNT] = -1.0
+        cols = keys.argmax(axis=1)
+        rows = heights[active, cols]
+
+        boards[active, rows, cols] = piece
+        heights[active, cols] += 1
+        moves[active, step] = cols
+
+        window_rows = CELL_WINDOW_ROWS[rows, cols]
+        window_cols = CELL_WINDOW_COLS[rows, cols]
+        cells = boards[active[:, np.newaxis, np.newaxis], window_rows, window_cols]
+        won = (cells == piece).all(axis=2).any(axis=1)
+
+        finished = active[won]
+        winners[finished] = 'Yellow' if piece == 1 else 'Red'
+        lengths[finished] = step + 1
+        active = active[~won]
+
+    return list(winners), [moves[i, :lengths[i]].tolist() for i in range(num_games)]
+
+
+# The order of the winners in the codes stored by GameStatistics
+WINNERS = ['Yellow', 'Red', 'Draw']
+
+
+def score_game(winner: str, player_selection: str) -> float:
+    """Return the win probability that a game won by winner gives the computer playing
+    against player_selection: 0.0 if player_selection won, 0.5 for a draw and 1.0 if the
+    computer won.
+    """
+    if winner == player_selection:
+        return 0.0
+    elif winner == 'Draw':
+        return 0.5
+    else:
+        return 1.0
+
+
+# The number of games in the rolling window of the win rate plots
+ROLLING_WINDOW = 50
+
+# The maximum number of points in each series plotted by GameStatistics.plot
+MAX_PLOT_POINTS = 5000
+
+
+class GameStatistics:
+    """The results of a sequence of Connect3 games played against the given player.
+
+    Results are added in O(1) time each, and are stored as one byte per game, so statistics
+    can be kept for runs of millions of games.
+
+    Instance Attributes:
+        - player: the player the computer played against
+        - computer: the player controlled by the computer
+
+    Representation Invariants:
+        - self.player in {'Yellow', 'Red'}
+        - self.computer in {'Yellow', 'Red'} and self.computer != self.player
+    """
+    player: str
+    computer: str
+    # Private Instance Attributes:
+    #   - _winners: the index in WINNERS of the winner of each game, in order
+    #   - _counts: the number of games won by each winner in WINNERS
+    _winners: array
+    _counts: list[int]
+
+    def __init__(self, player: str) -> None:
+        """Initialize statistics with no games, played against the given player.
+
+        Preconditions:
+            - player in {'Yellow', 'Red'}
+        """
+        self.player = player
+        if player == 'Red':
+            self.computer = 'Yellow'
+        else:
+            self.computer = 'Red'
+        self._winners = array('b')
+        self._counts = [0] * len(WINNERS)
+
+    def __len__(self) -> int:
+        """Return the number of games."""
+        return len(self._winners)
+
+    def add_result(self, winner: str) -> None:
+        """Add a game won by the given winner.
+
+        Preconditions:
+            - winner in {'Yellow', 'Red', 'Draw'}
+        """
+        code = WINNERS.index(winner)
+        self._winners.append(code)
+        self._counts[code] += 1
+
+    def add_results(self, winners: Iterable[str]) -> None:
+        """Add a game won by each of the given winners, in order."""
+        for winner in winners:
+            self.add_result(winner)
+
+    def get_winners(self) -> list[str]:
+        """Return the winner of each game, in order."""
+        return [WINNERS[code] for code in self._winners]
+
+    def count(self, winner: str, start: int = 0) -> int:
+        """Return the number of games from game start onwards won by the given winner.
+
+        Preconditions:
+            - winner in {'Yellow', 'Red', 'Draw'}
+            - start >= 0
+        """
+        if start == 0:
+            return self._counts[WINNERS.index(winner)]
+        return int(np.count_nonzero(self._codes()[start:] == WINNERS.index(winner)))
+
+    def _codes(self) -> np.ndarray:
+        """Return the winner codes as a numpy array, without copying them."""
+        return np.frombuffer(self._winners, dtype=np.int8)
+
+    def outcomes(self) -> np.ndarray:
+        """Return the outcome of each game for the computer: 1.0 for a win, 0.5 for a draw and
+        0.0 for a loss.
+        """
+        codes = self._codes()
+        outcomes = np.zeros(len(codes))
+        outcomes[codes == WINNERS.index(self.computer)] = 1.0
+        outcomes[codes == WINNERS.index('Draw')] = 0.5
+        return outcomes
+
+    def cumulative_win_rates(self) -> np.ndarray:
+        """Return the computer's mean outcome over the first i games, for each i."""
+        return np.cumsum(self.outcomes()) / np.arange(1, len(self) + 1)
+
+    def rolling_win_rates(self, window: int = ROLLING_WINDOW) -> np.ndarray:
+        """Return the computer's mean outcome over the most recent window games (or all games,
+        if there are fewer) at each game.
+
+        Preconditions:
+            - window >= 1
+        """
+        sums = np.concatenate(([0.0], np.cumsum(self.outcomes())))
+        ends = np.arange(1, len(self) + 1)
+        starts = np.maximum(ends - window, 0)
+        return (sums[ends] - sums[starts]) / (ends - starts)
+
+    def plot(self, max_points: int = MAX_PLOT_POINTS) -> None:
+        """Plot the outcomes and win rates of the games.
+
+        Each series is downsampled to at most max_points evenly spaced games, so the figure
+        stays small however many games were played.
+        """
+        # plotly is slow to import, so it is only imported when a plot is made, to keep
+        # headless training and worker processes fast to start
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+
+        games = np.unique(np.linspace(0, len(self) - 1, min(len(self), max_points)).astype(int))
+        x = games + 1
+
+        fig = make_subplots(rows=2, cols=1)
+        fig.add_trace(go.Scatter(x=x, y=self.outcomes()[games], mode='markers',
+                                 name='Outcome (1 = ' + self.computer + ' win, 0 = ' + self.player
+                                      + ' win, 0.5 = Draw)'), row=1, col=1)
+        fig.add_trace(go.Scatter(x=x, y=self.cumulative_win_rates()[games], mode='lines',
+                                 name=self.computer + ' win percentage (cumulative)'),
+                      row=2, col=1)
+        fig.add_trace(go.Scatter(x=x, y=self.rolling_win_rates()[games], mode='lines',
+                                 name=self.computer + ' win percentage (most recent '
+                                 + str(ROLLING_WINDOW) + ' games)'),
+                      row=2, col=1)
+        fig.update_yaxes(range=[0.0, 1.0], row=2, col=1)
+
+        fig.update_layout(title='Connect3 Game Results', xaxis_title='Game')
+        fig.show()
+
+
 def plot_game_statistics(results: list[str], player: str) -> None:
     """Plot the outcomes and win probabilities for a given list of Connect3 game results.
 
     Preconditions:
         - all(r in {'Yellow', 'Red', 'Draw'} for r in results)
     """
-    if player == 'Red':
-        computer = 'Yellow'
-    else:
-        computer = 'Red'
-    outcomes = []
-    for result in results:
-        if result == computer:
-            outcomes.append(1)
-        elif result == 'Draw':
-            outcomes.append(0.5)
-        else:
-            outcomes.append(0)
-
-    cumulative_win_probability = [sum(outcomes[0:i]) / i for i in range(1, len(outcomes) + 1)]
-    rolling_win_probability = \
-        [sum(outcomes[max(i - 50, 0):i]) / min(50, i) for i in range(1, len(outcomes) + 1)]
-
-    fig = make_subplots(rows=2, cols=1)
-    fig.add_trace(go.Scatter(y=outcomes, mode='markers',
-                             name='Outcome (1 = ' + computer + ' win, 0 = ' + player
-                                  + ' win, 0.5 = Draw)'), row=1, col=1)
-    fig.add_trace(go.Scatter(y=cumulative_win_probability, mode='lines',
-                             name=computer + ' win percentage (cumulative)'), row=2, col=1)
-    fig.add_trace(go.Scatter(y=rolling_win_probability, mode='lines',
-                             name=computer + ' win percentage (most recent 50 games)'),
-                  row=2, col=1)
-    fig.update_yaxes(range=[0.0, 1.0], row=2, col=1)
-
-    fig.update_layout(title='Connect3 Game Results', xaxis_title='Game')
-    fig.show()
+    statistics = GameStatistics(player)
+    statistics.add_results(results)
+    statistics.plot()
 
 # if __name__ == "__main__":
 
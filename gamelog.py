@@ -0,0 +1,182 @@
+"""CSC111 Winter 2021: Project Phase 2
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students and Faculty
+involved in CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited.
+
+This file is Copyright (c) 2021 Shayaan Khan, Markus Nimi, Matthew Chan and Aabid Anas.
+
+A compact append-only log of played Connect3 games.
+
+A game log starts with an 8 byte header:
+    - the magic bytes b'C3GL'
+    - the format version (uint16)
+    - two padding bytes
+
+followed by one record per game:
+    - one byte with the winner in its top 3 bits (the index of the winner in connect3.WINNERS)
+      and the number of moves in its bottom 5 bits
+    - the moves, two per byte: the first move of each pair in the low 4 bits and the second
+      in the high 4 bits
+
+so a game of n moves takes 1 + ceil(n / 2) bytes. Logs can be replayed into game trees for
+either player, with any scoring, without playing the games again.
+"""
+from __future__ import annotations
+import os
+import struct
+from typing import BinaryIO, Iterator, Optional, Union
+
+import connect3
+import gametree
+
+MAGIC = b'C3GL'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHxx')
+
+MAX_MOVES = 31
+# The number of bytes buffered by a GameLogWriter before they are written to the file
+WRITE_BUFFER_BYTES = 1 << 16
+READ_CHUNK_BYTES = 1 << 16
+
+
+class GameLogWriter:
+    """A writer appending games to a game log file.
+
+    Games are encoded into a buffer, which is written to the file whenever it reaches
+    WRITE_BUFFER_BYTES and when the writer is closed, so recording a game takes about a
+    microsecond and rarely touches the file. A GameLogWriter can be used in a with statement,
+    which closes it at the end.
+
+    Instance Attributes:
+        - path: the path of the log file
+        - games: the number of games written by this writer
+    """
+    path: str
+    games: int
+    # Private Instance Attributes:
+    #   - _file: the open log file
+    #   - _buffer: the encoded games not yet written to _file
+    _file: BinaryIO
+    _buffer: bytearray
+
+    def __init__(self, path: str) -> None:
+        """Open the log at path for appending, creating it if it does not exist.
+
+        Raise ValueError if the file exists but is not a game log.
+        """
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb') as file:
+                _read_header(file.read(HEADER.size))
+            self._file = open(path, 'ab')
+        else:
+            self._file = open(path, 'wb')
+            self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION))
+        self.path = path
+        self.games = 0
+        self._buffer = bytearray()
+
+    def __enter__(self) -> GameLogWriter:
+        return self
+
+    def __exit__(self, *exception_info: object) -> None:
+        self.close()
+
+    def write_game(self, winner: str, moves: list[int]) -> None:
+        """Append a game with the given winner and moves to the log.
+
+        Preconditions:
+            - winner in {'Yellow', 'Red', 'Draw'}
+            - len(moves) <= MAX_MOVES
+            - all(0 <= move < 16 for move in moves)
+        """
+        buffer = self._buffer
+        buffer.append(connect3.WINNERS.index(winner) << 5 | len(moves))
+        for i in range(0, len(moves) - 1, 2):
+            buffer.append(moves[i] | moves[i + 1] << 4)
+        if len(moves) % 2 == 1:
+            buffer.append(moves[-1])
+
+        self.games += 1
+        if len(buffer) >= WRITE_BUFFER_BYTES:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered games to the file."""
+        self._file.write(self._buffer)
+        self._file.flush()
+        self._buffer.clear()
+
+    def close(self) -> None:
+        """Write the buffered games and close the file."""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+def _read_header(header: bytes) -> None:
+    """Raise ValueError if header is not the header of a supported game log."""
+    if len(header) < HEADER.size:
+        raise ValueError('Not a game log')
+    magic, version = HEADER.unpack_from(header)
+    if magic != MAGIC:
+        raise ValueError('Not a game log')
+    elif version != FORMAT_VERSION:
+        raise ValueError('Unsupported game log version: ' + str(version))
+
+
+def read_games(path: str) -> Iterator[tuple[str, list[int]]]:
+    """Yield the winner and the moves of each game in the log at path, in order.
+
+    The file is read in chunks of READ_CHUNK_BYTES, so logs of any size can be read.
+    """
+    with open(path, 'rb') as file:
+        _read_header(file.read(HEADER.size))
+        data = b''
+        position = 0
+        while True:
+            chunk = file.read(READ_CHUNK_BYTES)
+            if chunk == b'':
+                break
+            data = data[position:] + chunk
+            position = 0
+            while position < len(data):
+                length = data[position] & MAX_MOVES
+                end = position + 1 + (length + 1) // 2
+                if end > len(data):
+                    # The rest of this record is in the next chunk
+                    break
+                moves = []
+                for byte in data[position + 1:end]:
+                    moves.append(byte & 15)
+                    moves.append(byte >> 4)
+                yield connect3.WINNERS[data[position] >> 5], moves[:length]
+                position = end
+
+        if position < len(data):
+            raise ValueError('Truncated game log')
+
+
+def replay_game_log(path: str, player_selection: str,
+                    game_tree: Optional[Union[gametree.GameTree,
+                                              gametree.CompactGameTree]] = None) \
+        -> Union[gametree.GameTree, gametree.CompactGameTree]:
+    """Insert every game in the log at path into game_tree, scored for player_selection in the
+    same way as runner.run_learning_algorithm, and return the tree.
+
+    If no game_tree is given, the games are inserted into a new GameTree. The games are
+    inserted with insert_many, so each node's win probability is calculated once.
+
+    Preconditions:
+        - player_selection in {'Yellow', 'Red'}
+        - game_tree is None or game_tree.player_selection == player_selection
+    """
+    if game_tree is None:
+        game_tree = gametree.GameTree(player_selection)
+    game_tree.insert_many((moves, connect3.score_game(winner, player_selection))
+                          for winner, moves in read_games(path))
+    return game_tree
@@ -0,0 +1,285 @@
+"""CSC111 Winter 2021: Project Phase 2
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students and Faculty
+involved in CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited.
+
+This file is Copyright (c) 2021 Shayaan Khan, Markus Nimi, Matthew Chan and Aabid Anas.
+
+A headless Connect3 game server, and a load generator to measure it.
+
+The server hosts one game per connection against an ExploringPlayer. All sessions read the
+same trained trees, which are memory-mapped read-only. Each session only has its own
+Connect3Game and ExploringPlayer, whose position in the tree is that session's cursor.
+
+Clients and the server exchange one JSON object per line. The client sends commands:
+    - {"command": "new_game", "human": "Yellow"} starts a new game, with the human playing
+      as "Yellow" or "Red"
+    - {"command": "move", "column": 2} makes the human's move
+    - {"command": "quit"} closes the connection
+
+and the server answers every command except quit with the state of the game:
+    {"ai_move": 1, "winner": null, "valid_moves": [0, 1, 2, 3, 4]}
+
+where ai_move is the AI's reply (or null if it did not move) and winner is "Yellow", "Red",
+"Draw" or null. An invalid command, including one whose fields have the wrong types (e.g. a
+column of true), is answered with {"error": "..."} and the connection stays open.
+
+Start a server and measure it with:
+    python gameserver.py serve --yellow-tree trees/yellow.c3gt --red-tree trees/red.c3gt
+    python gameserver.py load --clients 100 --games 20
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Optional, Union
+
+import numpy as np
+
+import connect3
+import gametree
+import treefile
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_TREE_FILES = {'Yellow': 'trees/yellow.c3gt', 'Red': 'trees/red.c3gt'}
+
+
+class GameSession:
+    """One game between a client and an ExploringPlayer.
+
+    Instance Attributes:
+        - game: the game being played
+        - human: the colour the client plays as
+    """
+    game: connect3.Connect3Game
+    human: str
+    # Private Instance Attributes:
+    #   - _ai: the player the client plays against, which keeps this session's position in
+    #     the shared game tree
+    _ai: connect3.ExploringPlayer
+
+    def __init__(self, human: str,
+                 game_tree: Union[gametree.GameTree, gametree.CompactGameTree],
+                 exploration_probability: float) -> None:
+        """Start a game with the client playing as human, against an ExploringPlayer reading
+        game_tree. If the AI plays Yellow, it makes the first move.
+
+        Preconditions:
+            - human in {'Yellow', 'Red'}
+            - game_tree.player_selection == human
+        """
+        self.game = connect3.Connect3Game()
+        self.human = human
+        self._ai = connect3.ExploringPlayer(game_tree, exploration_probability)
+
+    def play_ai_move(self, previous_move: Optional[int]) -> Optional[int]:
+        """Make the AI's move, if it is the AI's turn and the game is not over, and return it.
+        """
+        if self.game.get_winner() is not None or self.game.is_yellow_move() == \
+                (self.human == 'Yellow'):
+            return None
+        move = self._ai.make_move(self.game, previous_move)
+        self.game.make_move(move)
+        return move
+
+    def state(self, ai_move: Optional[int]) -> dict:
+        """Return the response describing this game after the AI's move ai_move."""
+        return {'ai_move': ai_move,
+                'winner': self.game.get_winner(),
+                'valid_moves': list(self.game.get_valid_moves())}
+
+
+class GameServer:
+    """A server hosting games against ExploringPlayers that share read-only game trees.
+
+    Instance Attributes:
+        - game_trees: the game tree used against a client playing as each colour
+        - exploration_probability: the exploration probability of the ExploringPlayers
+        - sessions: the number of games started
+        - moves: the number of moves made by clients
+    """
+    game_trees: dict[str, Union[gametree.GameTree, gametree.CompactGameTree]]
+    exploration_probability: float
+    sessions: int
+    moves: int
+
+    def __init__(self, game_trees: dict[str, Union[gametree.GameTree,
+                                                   gametree.CompactGameTree]],
+                 exploration_probability: float = 0.0) -> None:
+        """Initialize a server using the given game trees, keyed by the colour the client plays
+        as. The trees must not be changed while the server is running.
+        """
+        self.game_trees = game_trees
+        self.exploration_probability = exploration_probability
+        self.sessions = 0
+        self.moves = 0
+
+    def handle_command(self, session: Optional[GameSession], command: dict) \
+            -> tuple[Optional[GameSession], dict]:
+        """Return the session after the given command and the response to it.
+
+        Raise ValueError if the command is invalid, including if a field has the wrong type.
+        """
+        if command.get('command') == 'new_game':
+            human = command.get('human')
+            if not isinstance(human, str) or human not in self.game_trees:
+                raise ValueError('No game tree for a human playing as ' + str(human))
+            session = GameSession(human, self.game_trees[human], self.exploration_probability)
+            self.sessions += 1
+            return session, session.state(session.play_ai_move(None))
+        elif command.get('command') == 'move':
+            column = command.get('column')
+            if session is None:
+                raise ValueError('No game has been started')
+            elif session.game.get_winner() is not None:
+                raise ValueError('The game is over')
+            elif session.game.is_yellow_move() != (session.human == 'Yellow'):
+                raise ValueError("It is not the human's turn")
+            elif not isinstance(column, int) or isinstance(column, bool) \
+                    or column not in session.game.get_valid_moves():
+                raise ValueError('Invalid column: ' + str(column))
+            session.game.make_move(column)
+            self.moves += 1
+            return session, session.state(session.play_ai_move(column))
+        else:
+            raise ValueError('Unknown command: ' + str(command.get('command')))
+
+    async def handle_client(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+        """Play games with one connected client until it quits or disconnects."""
+        session = None
+        try:
+            while True:
+                line = await reader.readline()
+                if line == b'':
+                    break
+                try:
+                    command = json.loads(line)
+                    if not isinstance(command, dict):
+                        raise ValueError('Commands must be JSON objects')
+                    elif command.get('command') == 'quit':
+                        break
+                    session, response = self.handle_command(session, command)
+                except (ValueError, TypeError) as error:
+                    # json.JSONDecodeError is also a ValueError. A TypeError means a field
+                    # of the command had a type handle_command did not check for.
+                    response = {'error': str(error)}
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        """Accept clients at the given address until cancelled."""
+        server = await asyncio.start_server(self.handle_client, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+async def _play_load_games(host: str, port: int, games: int, latencies: list[float],
+                           rng: random.Random) -> int:
+    """Play the given number of games against the server at host and port with random
+    moves, alternating colours, and add the latency of every move to latencies.
+
+    Return the number of moves made.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    moves = 0
+    try:
+        for i in range(games):
+            human = 'Yellow' if i % 2 == 0 else 'Red'
+            writer.write(json.dumps({'command': 'new_game', 'human': human}).encode() + b'\n')
+            await writer.drain()
+            state = json.loads(await reader.readline())
+            while state.get('winner') is None:
+                column = rng.choice(state['valid_moves'])
+                start = time.perf_counter()
+                writer.write(json.dumps({'command': 'move', 'column': column}).encode() + b'\n')
+                await writer.drain()
+                state = json.loads(await reader.readline())
+                latencies.append(time.perf_counter() - start)
+                moves += 1
+                if 'error' in state:
+                    raise RuntimeError('Server error: ' + state['error'])
+        writer.write(json.dumps({'command': 'quit'}).encode() + b'\n')
+        await writer.drain()
+    finally:
+        writer.close()
+    return moves
+
+
+async def run_load(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, clients: int = 100,
+                   games: int = 20, seed: Optional[int] = None) -> dict[str, float]:
+    """Connect the given number of concurrent clients to the server at host and port, have
+    each play the given number of games, and return the moves per second and the latency
+    percentiles of the moves in milliseconds.
+    """
+    rng = random.Random(seed)
+    latencies = []
+    start = time.perf_counter()
+    move_counts = await asyncio.gather(
+        *[_play_load_games(host, port, games, latencies, random.Random(rng.random()))
+          for _ in range(clients)])
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = 1000 * np.array(latencies)
+    return {'clients': clients,
+            'moves': sum(move_counts),
+            'moves_per_second': sum(move_counts) / elapsed,
+            'p50_ms': float(np.percentile(latencies_ms, 50)),
+            'p99_ms': float(np.percentile(latencies_ms, 99))}
+
+
+def main(arguments: list[str]) -> None:
+    """Run the server or the load generator with the given command line arguments."""
+    parser = argparse.ArgumentParser(description='Connect3 game server.')
+    subparsers = parser.add_subparsers(dest='mode', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help='run the game server')
+    serve_parser.add_argument('--yellow-tree', default=DEFAULT_TREE_FILES['Yellow'],
+                              help='the tree file used when the human plays as Yellow')
+    serve_parser.add_argument('--red-tree', default=DEFAULT_TREE_FILES['Red'],
+                              help='the tree file used when the human plays as Red')
+    serve_parser.add_argument('--exploration', type=float, default=0.0,
+                              help='the exploration probability of the AI')
+
+    load_parser = subparsers.add_parser('load', help='measure a running game server')
+    load_parser.add_argument('--clients', type=int, default=100,
+                             help='the number of concurrent clients')
+    load_parser.add_argument('--games', type=int, default=20,
+                             help='the number of games played by each client')
+    load_parser.add_argument('--seed', type=int, default=None)
+
+    for subparser in (serve_parser, load_parser):
+        subparser.add_argument('--host', default=DEFAULT_HOST)
+        subparser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(arguments)
+
+    if args.mode == 'serve':
+        game_trees = {'Yellow': treefile.open_compact_game_tree(args.yellow_tree),
+                      'Red': treefile.open_compact_game_tree(args.red_tree)}
+        print('Serving on ' + args.host + ':' + str(args.port))
+        asyncio.run(GameServer(game_trees, args.exploration).serve(args.host, args.port))
+    else:
+        results = asyncio.run(run_load(args.host, args.port, args.clients, args.games,
+                                       args.seed))
+        print('========== Game server load (' + str(results['clients']) + ' clients, '
+              + str(results['moves']) + ' moves) ==========')
+        print('Moves per second: ' + str(round(results['moves_per_second'], 1)))
+        print('Latency p50: ' + str(round(results['p50_ms'], 3)) + ' ms')
+        print('Latency p99: ' + str(round(results['p99_ms'], 3)) + ' ms')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
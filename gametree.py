@@ -11,9 +11,53 @@ expressly prohibited.
 This file is Copyright (c) 2021 Shayaan Khan, Markus Nimi, Matthew Chan and Aabid Anas."""
 
 from __future__ import annotations
-from typing import Optional
+import random
+from array import array
+from typing import Iterable, Optional, Union
 
 GAME_START_MOVE = -1
+NO_NODE = -1
+
+# The size of the Connect3 board. This is the only definition of it: connect3 and main
+# import it from here.
+ROW_COUNT = 4
+COLUMN_COUNT = 5
+# The board is symmetric about this column
+CENTRE_COLUMN = (COLUMN_COUNT - 1) // 2
+
+# Zobrist keys used to identify positions. The key of a position is the XOR of
+# ZOBRIST_KEYS[piece - 1][row][column] for every disc on the board (where piece is 1 for yellow
+# and 2 for red), XORed with ZOBRIST_RED_TO_MOVE if red is to move next.
+_zobrist_random = random.Random(111)
+ZOBRIST_KEYS = [[[_zobrist_random.getrandbits(64) for _ in range(COLUMN_COUNT)]
+                 for _ in range(ROW_COUNT)] for _ in range(2)]
+ZOBRIST_RED_TO_MOVE = _zobrist_random.getrandbits(64)
+
+# Subtrees closer to the root than this are never evicted from a tree with a node budget
+EVICTION_MIN_DEPTH = 4
+# When a tree exceeds its node budget, subtrees are evicted until it has at most this fraction
+# of the budget, so that evictions are rare
+EVICTION_TARGET = 0.9
+
+
+def mirror_move(move: int) -> int:
+    """Return the column that move is mapped to when the board is mirrored left to right."""
+    return COLUMN_COUNT - 1 - move
+
+
+def canonicalize_move_sequence(moves: list[int]) -> list[int]:
+    """Return the canonical orientation of the given sequence of moves: the sequence itself if
+    its first move outside CENTRE_COLUMN is left of the centre, otherwise its mirror image.
+
+    A sequence and its mirror image lead to mirror-image positions with the same outcome, so
+    a mirror-symmetric tree only stores the canonical one.
+    """
+    for move in moves:
+        if move != CENTRE_COLUMN:
+            if move > CENTRE_COLUMN:
+                return [mirror_move(m) for m in moves]
+            break
+    return list(moves)
 
 
 class GameTree:
@@ -33,24 +77,86 @@ class GameTree:
             - A draw results in a value of 0.5
         - _subtrees: the subtrees of this tree, which represent the game trees after a
         possible move by the current player
+        - _subtree_slots: None if this tree has no subtrees, otherwise a list where
+        _subtree_slots[c] is the subtree for the move in column c, or None. (In a
+        transposition-aware tree a subtree shared by several positions may have been created
+        by a different move, so its move attribute cannot be used to find it.)
+        - _win_total: the sum of the win probabilities of the subtrees, in the order of
+        _subtrees
+        - _best_subtree: the left-most subtree with the largest win probability, or None
+        - _transpositions: on the root of a transposition-aware tree, a mapping from the
+        Zobrist key of every position in the tree to its node. None otherwise.
+        - _parents: on the root of a transposition-aware tree, a mapping from every node
+        except the root to the list of its parents. None otherwise.
+        - visits: the number of inserted games that passed through this tree
+        - _node_budget: on the root of a tree with a node budget, the maximum number of nodes
+        in the tree. None otherwise.
+        - _node_count: on the root of a tree with a node budget, the number of nodes in the
+        tree. 0 otherwise.
+        - _symmetric: whether this is the root of a mirror-symmetric tree
+
+    In a transposition-aware tree, every move order that reaches the same position shares one
+    node, so the tree is a directed acyclic graph rather than a tree.
+
+    When a tree with a node budget grows past its budget, the least visited subtrees at least
+    EVICTION_MIN_DEPTH moves deep are removed, and the win probabilities of their ancestors
+    are recalculated from the remaining subtrees. A node whose subtrees were all removed keeps
+    its last win probability.
+
+    A mirror-symmetric tree only stores move sequences in their canonical orientation (see
+    canonicalize_move_sequence), so a game and its mirror image are learned by the same nodes.
+    Players reading it must map moves to and from the canonical orientation.
     """
     move: int
     is_yellow_move: bool
     win_probability: float
     _subtrees: list[GameTree]
+    _subtree_slots: Optional[list[Optional[GameTree]]]
+    _win_total: float
+    _best_subtree: Optional[GameTree]
+    _transpositions: Optional[dict[int, GameTree]]
+    _parents: Optional[dict[GameTree, list[GameTree]]]
+    visits: int
+    _node_budget: Optional[int]
+    _node_count: int
+    _symmetric: bool
     player_selection: str
 
     def __init__(self, player_selection: str, move: int = GAME_START_MOVE,
-                 is_yellow_move: bool = True, win_probability: Optional[float] = 0.0) -> None:
+                 is_yellow_move: bool = True, win_probability: Optional[float] = 0.0,
+                 transpositions: bool = False, node_budget: Optional[int] = None,
+                 symmetric: bool = False) -> None:
         """Initialize the variables of this new game tree.
 
-        On the root tree, move is the starting move and yellow goes first
+        On the root tree, move is the starting move and yellow goes first. If transpositions
+        is True, this tree is the root of a transposition-aware tree. If node_budget is given,
+        this tree is the root of a tree that is kept to at most node_budget nodes as moves are
+        inserted into it. If symmetric is True, this tree is the root of a mirror-symmetric
+        tree.
+
+        Preconditions:
+            - not (transpositions and node_budget is not None)
+            - not (transpositions and symmetric)
+            - node_budget is None or node_budget >= 1
         """
         self.move = move
         self.is_yellow_move = is_yellow_move
         self.win_probability = win_probability
         self._subtrees = []
+        self._subtree_slots = None
+        self._win_total = 0.0
+        self._best_subtree = None
         self.player_selection = player_selection
+        if transpositions:
+            self._transpositions = {0 if is_yellow_move else ZOBRIST_RED_TO_MOVE: self}
+            self._parents = {}
+        else:
+            self._transpositions = None
+            self._parents = None
+        self.visits = 0
+        self._node_budget = node_budget
+        self._node_count = 1 if node_budget is not None else 0
+        self._symmetric = symmetric
 
     def __str__(self) -> str:
         """Return a string representation of this tree."""
@@ -61,22 +167,11 @@ class GameTree:
 
         The indentation level is specified by the <depth> parameter.
         """
-        if self.is_yellow_move:
-            turn_desc = "Yellow's move"
-        else:
-            turn_desc = "Red's move"
-        move_desc = f'{self.move} -> {turn_desc} ({self.win_probability})\n'
-        s = '  ' * depth + move_desc
-        if self._subtrees == []:
-            return s
-        else:
-            for subtree in self._subtrees:
-                s += subtree._str_indented(depth + 1)
-            return s
+        return _str_indented(self, depth)
 
     def add_subtree(self, subtree: GameTree) -> None:
         """Add a subtree to this game tree."""
-        self._subtrees.append(subtree)
+        self._link_subtree(subtree.move, subtree)
         self._update_win_probability()
 
     def get_subtrees(self) -> list[GameTree]:
@@ -88,10 +183,27 @@ class GameTree:
 
         Return None if no subtree corresponds to that move.
         """
-        for subtree in self._subtrees:
-            if subtree.move == move:
-                return subtree
-        return None
+        if self._subtree_slots is None:
+            return None
+        return self._subtree_slots[move]
+
+    def has_transpositions(self) -> bool:
+        """Return whether this is the root of a transposition-aware tree."""
+        return self._transpositions is not None
+
+    def is_symmetric(self) -> bool:
+        """Return whether this is the root of a mirror-symmetric tree."""
+        return self._symmetric
+
+    def get_subtree_by_position(self, position_key: int) -> Optional[GameTree]:
+        """Return the node of the position with the given Zobrist key.
+
+        Return None if the position is not in this tree.
+
+        Preconditions:
+            - self.has_transpositions()
+        """
+        return self._transpositions.get(position_key)
 
     def get_optimal_subtree(self) -> Optional[GameTree]:
         """Return the left-most subtree corresponding to the largest or smallest yellow win
@@ -99,69 +211,699 @@ class GameTree:
 
         Return None if no subtree corresponds to that probability or there are no subtrees.
         """
-        if self._subtrees == []:
-            # There are no subtrees; this is uncharted territory
+        return self._best_subtree
+
+    def get_optimal_move(self) -> Optional[int]:
+        """Return the move leading to the subtree returned by get_optimal_subtree.
+
+        Return None if there are no subtrees.
+        """
+        best = self._best_subtree
+        if best is None:
             return None
+        elif self._subtree_slots[best.move] is best:
+            return best.move
         else:
-            maximum = max(tree.win_probability for tree in self.get_subtrees())
-            for subtree in self._subtrees:
-                if subtree.win_probability == maximum:
-                    return subtree
-            return None
+            # best is shared with another position in a transposition-aware tree
+            return self._subtree_slots.index(best)
 
     def insert_move_sequence(self, moves: list[int], win_probability: float = 0.0) -> None:
         """Insert the given sequence of moves into this tree.
+
+        Each node keeps the total and the best of its subtrees' win probabilities, so only the
+        nodes along the inserted path are updated, each in constant time.
+
+        If this is the root of a mirror-symmetric tree, the canonical orientation of moves is
+        inserted instead.
         """
-        move_in_tree = self.get_subtree_by_move(moves[0])
-        moves_mutable = moves.copy()
-        moves_mutable.reverse()
-        prob = win_probability
+        if self._symmetric:
+            moves = canonicalize_move_sequence(moves)
+        if self._transpositions is not None:
+            self._insert_with_transpositions(moves, win_probability)
+            return
+
+        node = self
+        node.visits += 1
+        path = [self]
+        linked_depth = None
+        for move in moves:
+            subtree = node.get_subtree_by_move(move)
+            if subtree is None:
+                subtree = GameTree(self.player_selection, move, not node.is_yellow_move,
+                                   win_probability)
+                node._link_subtree(move, subtree)
+                node._add_to_aggregates(subtree)
+                if linked_depth is None:
+                    linked_depth = len(path) - 1
+            node = subtree
+            node.visits += 1
+            path.append(node)
+
+        if self._node_budget is not None and linked_depth is not None:
+            self._node_count += len(moves) - linked_depth
+            if self._node_count > self._node_budget:
+                self._propagate_win_probability(path, linked_depth)
+                self._evict_subtrees()
+                return
 
-        # Case 1: move[0] is not a child of the trees root
-        if move_in_tree is None:
-            turn = False
-            self._next_move(moves_mutable, turn, prob)
+        if linked_depth is None:
+            # The whole game was already in the tree, so no win probability changes
             return
-        # Case 2: moves[0] is a child of this trees root
-        elif move_in_tree is not None:
-            turn = True
-            moves_mutable.pop()
-            move_in_tree._next_move(moves_mutable, turn, prob)
+        self._propagate_win_probability(path, linked_depth)
+
+    def insert_many(self, games: Iterable[tuple[list[int], float]]) -> None:
+        """Insert every (moves, win_probability) pair of games into this tree, leaving it the
+        same as calling insert_move_sequence on each pair in order.
+
+        The moves are all linked in first, and then every node that gained a subtree, and its
+        ancestors, has its win probability recalculated once, deepest first. So a node near
+        the root is recalculated once per call rather than once per game, and inserting many
+        games takes time proportional to their total number of moves. games may be any
+        iterable, e.g. a generator reading a game log.
+
+        Transposition-aware trees and trees with a node budget insert the games one at a time,
+        since their win probabilities and evictions depend on the order of the inserts.
+        """
+        if self._transpositions is not None or self._node_budget is not None:
+            for moves, win_probability in games:
+                self.insert_move_sequence(moves, win_probability)
             return
 
-    def _next_move(self, moves: list[int], turn: bool, win_probability: float) -> None:
-        """Recursive helper function that calls list.pop() in order to add the next move"""
-        if moves == []:  # if the moves list gets popped before this method is called
-            return None
-        move = moves.pop()
-        if self.get_subtree_by_move(move) is not None:
-            next_turn = not turn
-            self._update_win_probability()
-            self.get_subtree_by_move(move)._next_move(moves, next_turn, win_probability)
+        # changed_by_depth[d] is the list of nodes d moves below this tree whose win
+        # probability must be recalculated, and changed is the set of all of them
+        changed_by_depth = []
+        changed = set()
+        for moves, win_probability in games:
+            if self._symmetric:
+                moves = canonicalize_move_sequence(moves)
+            node = self
+            node.visits += 1
+            path = [self]
+            linked_depth = None
+            for move in moves:
+                subtree = node.get_subtree_by_move(move)
+                if subtree is None:
+                    subtree = GameTree(self.player_selection, move, not node.is_yellow_move,
+                                       win_probability)
+                    node._link_subtree(move, subtree)
+                    node._add_to_aggregates(subtree)
+                    if linked_depth is None:
+                        linked_depth = len(path) - 1
+                node = subtree
+                node.visits += 1
+                path.append(node)
+
+            if linked_depth is not None:
+                # The new nodes below path[linked_depth] are already up to date, since each
+                # has one subtree with its own win probability
+                for depth in range(linked_depth, -1, -1):
+                    if path[depth] in changed:
+                        # Its ancestors were marked along with it
+                        break
+                    changed.add(path[depth])
+                    while len(changed_by_depth) <= depth:
+                        changed_by_depth.append([])
+                    changed_by_depth[depth].append(path[depth])
+
+        for nodes in reversed(changed_by_depth):
+            for node in nodes:
+                node._update_win_probability()
+
+    def _propagate_win_probability(self, path: list[GameTree], linked_depth: int) -> None:
+        """Update the win probabilities along the path of a newly inserted move sequence, where
+        path[linked_depth] is the first node that gained a subtree.
+
+        The new nodes all have the same win probability, so the win probabilities are updated
+        from path[linked_depth] back to this tree, stopping once a node's win probability no
+        longer changes.
+        """
+        for i in range(linked_depth, -1, -1):
+            old_win_probability = path[i].win_probability
+            path[i]._set_win_probability_from_aggregates()
+            if path[i].win_probability == old_win_probability:
+                return
+            elif i > 0:
+                path[i - 1]._update_win_total()
+                path[i - 1]._update_best_subtree(path[i], old_win_probability)
+
+    def _insert_with_transpositions(self, moves: list[int], win_probability: float) -> None:
+        """Insert the given sequence of moves into this transposition-aware tree.
+
+        Positions already in the tree are reused through self._transpositions. The win
+        probabilities along the inserted path are recalculated from the last move back to the
+        root, and whenever a shared node's win probability changes, all of its other parents
+        (found through self._parents) are recalculated too. Every parent of a position is one
+        move shallower than it, so the nodes are recalculated one depth at a time, deepest
+        first, and each is up to date before its parents.
+
+        Preconditions:
+            - self.has_transpositions()
+            - moves is a sequence of valid moves starting from an empty board
+        """
+        heights = [0] * COLUMN_COUNT
+        position_key = 0
+        is_yellow_move = True
+        node = self
+        path = [self]
+        for move in moves:
+            piece_index = 0 if is_yellow_move else 1
+            position_key ^= ZOBRIST_KEYS[piece_index][heights[move]][move] ^ ZOBRIST_RED_TO_MOVE
+            heights[move] += 1
+            is_yellow_move = not is_yellow_move
+
+            subtree = node.get_subtree_by_move(move)
+            if subtree is None:
+                subtree = self._transpositions.get(position_key)
+                if subtree is None:
+                    subtree = GameTree(self.player_selection, move, is_yellow_move,
+                                       win_probability)
+                    self._transpositions[position_key] = subtree
+                    self._parents[subtree] = []
+                node._link_subtree(move, subtree)
+                self._parents[subtree].append(node)
+            node = subtree
+            path.append(node)
+
+        # changed[d] is the set of nodes d moves deep to recalculate, starting with the path
+        changed = [{node} for node in path]
+        for depth in range(len(path) - 1, -1, -1):
+            path[depth].visits += 1
+            for node in changed[depth]:
+                old_win_probability = node.win_probability
+                node._update_win_probability()
+                if depth > 0 and node.win_probability != old_win_probability:
+                    changed[depth - 1].update(self._parents[node])
+
+    def _evict_subtrees(self) -> None:
+        """Remove the least visited subtrees at least EVICTION_MIN_DEPTH moves deep, until this
+        tree has at most EVICTION_TARGET of its node budget, then recalculate the win
+        probabilities of their ancestors.
+
+        Among equally visited subtrees the shallowest are removed first, so that a cold
+        subtree is removed as a whole rather than from its leaves up.
+
+        Preconditions:
+            - self._node_budget is not None
+        """
+        # Find every candidate subtree, its parent and its depth
+        parents = {}
+        depths = {self: 0}
+        candidates = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            for subtree in node._subtrees:
+                parents[subtree] = node
+                depths[subtree] = depths[node] + 1
+                if depths[subtree] >= EVICTION_MIN_DEPTH:
+                    candidates.append(subtree)
+                stack.append(subtree)
+        candidates.sort(key=lambda candidate: (candidate.visits, depths[candidate]))
+
+        target = int(self._node_budget * EVICTION_TARGET)
+        evicted = set()
+        changed_parents = []
+        for subtree in candidates:
+            if self._node_count <= target:
+                break
+
+            # Skip subtrees inside a subtree that was already evicted
+            ancestor = parents[subtree]
+            while ancestor is not self and ancestor not in evicted:
+                ancestor = parents[ancestor]
+            if ancestor is not self:
+                continue
+
+            parent = parents[subtree]
+            parent._subtrees.remove(subtree)
+            parent._subtree_slots[subtree.move] = None
+            evicted.add(subtree)
+            changed_parents.append(parent)
+            self._node_count -= _count_nodes(subtree)
+
+        # Recalculate the win probabilities of the changed nodes and their ancestors, deepest
+        # first so that every subtree is up to date before its parent
+        changed = set()
+        for node in changed_parents:
+            while node is not None and node not in changed:
+                changed.add(node)
+                node = parents.get(node)
+        for node in sorted(changed, key=lambda n: -depths[n]):
+            node._update_win_probability()
+
+    def merge(self, other: GameTree) -> None:
+        """Merge the moves and win probabilities learned by other into this tree.
+
+        Subtrees that only appear in other are moved into this tree, so other should not be
+        used afterwards. Where both trees contain the same move, the subtrees are merged
+        recursively and the win probability is recalculated from the merged subtrees, which
+        is the win probability this tree would have had if it had learned all the games.
+        If this tree has a node budget, subtrees are then evicted to stay within it.
+
+        Preconditions:
+            - self.move == other.move
+            - self.player_selection == other.player_selection
+        """
+        if self._transpositions is not None or other._transpositions is not None:
+            raise ValueError('Transposition-aware game trees cannot be merged')
+        elif self._symmetric != other._symmetric:
+            raise ValueError('Mirror-symmetric game trees can only be merged with each other')
+
+        self.visits += other.visits
+        for other_subtree in other.get_subtrees():
+            subtree = self.get_subtree_by_move(other_subtree.move)
+            if subtree is None:
+                self._link_subtree(other_subtree.move, other_subtree)
+            else:
+                subtree.merge(other_subtree)
+        self._update_win_probability()
+
+        if self._node_budget is not None:
+            self._node_count = _count_nodes(self)
+            if self._node_count > self._node_budget:
+                self._evict_subtrees()
+
+    def _link_subtree(self, move: int, subtree: GameTree) -> None:
+        """Add subtree as the subtree for the given move, without updating any win
+        probabilities.
+        """
+        if self._subtree_slots is None:
+            self._subtree_slots = [None] * COLUMN_COUNT
+        self._subtrees.append(subtree)
+        self._subtree_slots[move] = subtree
+
+    def _is_computer_move(self) -> bool:
+        """Return whether the computer (the opponent of player_selection) chooses the move
+        at this tree, in which case its win probability is the maximum of its subtrees'.
+        """
+        return (self.player_selection == "Red" and self.is_yellow_move) \
+            or (self.player_selection == "Yellow" and not self.is_yellow_move)
+
+    def _aggregate_win_probability(self) -> float:
+        """Return the win probability given by the aggregates of the subtrees.
+
+        Preconditions:
+            - self._subtrees != []
+        """
+        if self._is_computer_move():
+            return self._best_subtree.win_probability
         else:
-            self.add_subtree(GameTree(self.player_selection, move, turn, win_probability))
-            next_turn = not turn
-            self.get_subtree_by_move(move)._next_move(moves, next_turn, win_probability)
-        return None
+            return self._win_total / len(self._subtrees)
+
+    def _set_win_probability_from_aggregates(self) -> None:
+        """Set the win probability from the aggregates, if this tree has subtrees."""
+        if self._subtrees != []:
+            self.win_probability = self._aggregate_win_probability()
+
+    def _add_to_aggregates(self, subtree: GameTree) -> None:
+        """Update the aggregates for a subtree that was just linked."""
+        self._update_win_total()
+        if self._best_subtree is None \
+                or subtree.win_probability > self._best_subtree.win_probability:
+            self._best_subtree = subtree
+
+    def _update_win_total(self) -> None:
+        """Recalculate self._win_total from the subtrees.
+
+        The total is summed again rather than adjusted by the change in one subtree, so that
+        it does not gather rounding errors and only depends on the subtrees' win
+        probabilities, not on the order in which they changed.
+        """
+        self._win_total = sum(subtree.win_probability for subtree in self._subtrees)
+
+    def _update_best_subtree(self, subtree: GameTree, old_win_probability: float) -> None:
+        """Update self._best_subtree after the win probability of subtree has changed from
+        old_win_probability.
+        """
+        best = self._best_subtree
+        if subtree is best:
+            if subtree.win_probability < old_win_probability:
+                self._best_subtree = self._find_best_subtree()
+        elif subtree.win_probability > best.win_probability:
+            self._best_subtree = subtree
+        elif subtree.win_probability == best.win_probability:
+            # Keep the left-most of the two
+            self._best_subtree = self._find_best_subtree()
+
+    def _find_best_subtree(self) -> Optional[GameTree]:
+        """Return the left-most subtree with the largest win probability, or None."""
+        best = None
+        for subtree in self._subtrees:
+            if best is None or subtree.win_probability > best.win_probability:
+                best = subtree
+        return best
 
     def _update_win_probability(self) -> None:
         """ Recalculate the win probability of this tree given the red or yellow player
 
         When this subtree is for this player, take the max because we can choose the path
         When this subtree is for the opponent, take the average because we don't choose the path
+
+        The aggregates of the subtrees are also recalculated from scratch.
         """
-        if self.get_subtrees() == []:
-            return None
-        elif (self.player_selection == "Red" and self.is_yellow_move) \
-                or (self.player_selection == "Yellow" and not self.is_yellow_move):
-            self.win_probability = \
-                max(tree.win_probability for tree in self.get_subtrees())
-        else:
-            self.win_probability = \
-                sum(subtree.win_probability for subtree in self.get_subtrees()) / \
-                len(self.get_subtrees())
+        self._update_win_total()
+        self._best_subtree = self._find_best_subtree()
+        self._set_win_probability_from_aggregates()
         return None
 
+
+def _str_indented(tree: Union[GameTree, CompactGameTree], depth: int) -> str:
+    """Return an indented string representation of tree, whose indentation level is depth.
+
+    The lines are collected in a list and joined once, so this takes linear time. To write a
+    large tree without building the whole string, use treeexport.export_text.
+    """
+    lines = []
+    stack = [(depth, tree)]
+    while stack:
+        node_depth, node = stack.pop()
+        if node.is_yellow_move:
+            turn_desc = "Yellow's move"
+        else:
+            turn_desc = "Red's move"
+        lines.append('  ' * node_depth + f'{node.move} -> {turn_desc} ({node.win_probability})\n')
+        for subtree in reversed(node.get_subtrees()):
+            stack.append((node_depth + 1, subtree))
+    return ''.join(lines)
+
+
+def _count_nodes(tree: GameTree) -> int:
+    """Return the number of nodes in the given tree, which is not transposition-aware."""
+    count = 0
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.get_subtrees())
+    return count
+
+
+class CompactTreeStorage:
+    """The nodes of a CompactGameTree, stored in parallel typed arrays.
+
+    The arrays may also be read-only numpy arrays, e.g. when the tree is memory-mapped from a
+    file by treefile.open_compact_game_tree.
+
+    Node i is described by the i-th entry of each array, and node 0 is the root. The
+    subtrees of a node form a linked list in the order they were added: first_subtrees[i] is
+    the index of the first subtree of node i and next_siblings[j] is the index of the subtree
+    added after node j to the same parent, or NO_NODE if there is none.
+
+    Instance Attributes:
+        - player_selection: the player_selection shared by every node
+        - symmetric: whether the tree is mirror-symmetric, as defined in GameTree
+        - moves: the move of each node
+        - is_yellow_moves: whether yellow is the player to move at each node (0 or 1)
+        - win_probabilities: the win probability of each node
+        - first_subtrees: the index of the first subtree of each node
+        - next_siblings: the index of the next sibling of each node
+    """
+    player_selection: str
+    symmetric: bool
+    moves: array
+    is_yellow_moves: array
+    win_probabilities: array
+    first_subtrees: array
+    next_siblings: array
+
+    def __init__(self, player_selection: str, symmetric: bool = False) -> None:
+        """Initialize a storage containing only a root node."""
+        self.player_selection = player_selection
+        self.symmetric = symmetric
+        self.moves = array('b', [GAME_START_MOVE])
+        self.is_yellow_moves = array('b', [1])
+        self.win_probabilities = array('d', [0.0])
+        self.first_subtrees = array('i', [NO_NODE])
+        self.next_siblings = array('i', [NO_NODE])
+
+    def __len__(self) -> int:
+        """Return the number of nodes in this storage."""
+        return len(self.moves)
+
+    def find_subtree(self, index: int, move: int) -> int:
+        """Return the index of the subtree of node index with the given move, or NO_NODE."""
+        subtree = self.first_subtrees[index]
+        while subtree != NO_NODE and self.moves[subtree] != move:
+            subtree = self.next_siblings[subtree]
+        return subtree
+
+    def add_subtree(self, index: int, move: int, is_yellow_move: bool,
+                    win_probability: float) -> int:
+        """Add a new subtree to node index and return the index of the new node."""
+        new_index = len(self.moves)
+        self.moves.append(move)
+        self.is_yellow_moves.append(is_yellow_move)
+        self.win_probabilities.append(win_probability)
+        self.first_subtrees.append(NO_NODE)
+        self.next_siblings.append(NO_NODE)
+
+        subtree = self.first_subtrees[index]
+        if subtree == NO_NODE:
+            self.first_subtrees[index] = new_index
+        else:
+            while self.next_siblings[subtree] != NO_NODE:
+                subtree = self.next_siblings[subtree]
+            self.next_siblings[subtree] = new_index
+        return new_index
+
+    def update_win_probability(self, index: int) -> None:
+        """Recalculate the win probability of node index in the same way as
+        GameTree._update_win_probability.
+        """
+        subtree = self.first_subtrees[index]
+        if subtree == NO_NODE:
+            return
+
+        win_probabilities = self.win_probabilities
+        if self.is_yellow_moves[index] == (self.player_selection == 'Red'):
+            # The computer chooses the move here, so take the max
+            best = win_probabilities[subtree]
+            while subtree != NO_NODE:
+                best = max(best, win_probabilities[subtree])
+                subtree = self.next_siblings[subtree]
+            win_probabilities[index] = best
+        else:
+            total = 0.0
+            count = 0
+            while subtree != NO_NODE:
+                total += win_probabilities[subtree]
+                count += 1
+                subtree = self.next_siblings[subtree]
+            win_probabilities[index] = total / count
+
+
+class CompactGameTree:
+    """A decision tree for Connect3 moves with the same methods as GameTree, whose nodes are
+    stored in a shared CompactTreeStorage instead of as separate objects.
+
+    A CompactGameTree is only a lightweight view of one node of the storage, so it uses a
+    fraction of the memory of a GameTree with the same nodes. New views are created whenever
+    subtrees are returned, so views should be compared with == rather than is.
+    """
+    __slots__ = ('_storage', '_index')
+    _storage: CompactTreeStorage
+    _index: int
+
+    def __init__(self, player_selection: str, storage: Optional[CompactTreeStorage] = None,
+                 index: int = 0, symmetric: bool = False) -> None:
+        """Initialize a view of node index in storage.
+
+        If no storage is given, a new tree is created and this is its root. It is
+        mirror-symmetric if symmetric is True.
+        """
+        if storage is None:
+            storage = CompactTreeStorage(player_selection, symmetric)
+        self._storage = storage
+        self._index = index
+
+    @property
+    def move(self) -> int:
+        """The column of the move (0 to 4 inclusive), or GAME_START_MOVE if this is the root"""
+        return int(self._storage.moves[self._index])
+
+    @property
+    def is_yellow_move(self) -> bool:
+        """Whether yellow is the current player to move"""
+        return bool(self._storage.is_yellow_moves[self._index])
+
+    @property
+    def win_probability(self) -> float:
+        """The win probability of this tree, as defined in GameTree"""
+        return float(self._storage.win_probabilities[self._index])
+
+    @property
+    def player_selection(self) -> str:
+        """The player_selection of this tree, as defined in GameTree"""
+        return self._storage.player_selection
+
+    def __eq__(self, other: object) -> bool:
+        """Return whether other is a view of the same node."""
+        return isinstance(other, CompactGameTree) and self._storage is other._storage \
+            and self._index == other._index
+
+    def __hash__(self) -> int:
+        """Return a hash of the node this view refers to."""
+        return hash((id(self._storage), self._index))
+
+    def __str__(self) -> str:
+        """Return a string representation of this tree."""
+        return self._str_indented(0)
+
+    def _str_indented(self, depth: int) -> str:
+        """Return an indented string representation of this tree.
+
+        The indentation level is specified by the <depth> parameter.
+        """
+        return _str_indented(self, depth)
+
+    def _view(self, index: int) -> CompactGameTree:
+        """Return a view of node index in this tree's storage."""
+        return CompactGameTree(self._storage.player_selection, self._storage, index)
+
+    def get_subtrees(self) -> list[CompactGameTree]:
+        """Return the subtrees of this game tree."""
+        storage = self._storage
+        subtrees = []
+        subtree = storage.first_subtrees[self._index]
+        while subtree != NO_NODE:
+            subtrees.append(self._view(subtree))
+            subtree = storage.next_siblings[subtree]
+        return subtrees
+
+    def get_subtree_by_move(self, move: int) -> Optional[CompactGameTree]:
+        """Return the subtree corresponding to the given move.
+
+        Return None if no subtree corresponds to that move.
+        """
+        subtree = self._storage.find_subtree(self._index, move)
+        if subtree == NO_NODE:
+            return None
+        return self._view(subtree)
+
+    def has_transpositions(self) -> bool:
+        """Return whether this is the root of a transposition-aware tree, which it never is."""
+        return False
+
+    def is_symmetric(self) -> bool:
+        """Return whether this is the root of a mirror-symmetric tree."""
+        return self._index == 0 and self._storage.symmetric
+
+    def get_optimal_subtree(self) -> Optional[CompactGameTree]:
+        """Return the left-most subtree corresponding to the largest win probability.
+
+        Return None if there are no subtrees.
+        """
+        storage = self._storage
+        best = NO_NODE
+        subtree = storage.first_subtrees[self._index]
+        while subtree != NO_NODE:
+            if best == NO_NODE or \
+                    storage.win_probabilities[subtree] > storage.win_probabilities[best]:
+                best = subtree
+            subtree = storage.next_siblings[subtree]
+
+        if best == NO_NODE:
+            return None
+        return self._view(best)
+
+    def get_optimal_move(self) -> Optional[int]:
+        """Return the move leading to the subtree returned by get_optimal_subtree.
+
+        Return None if there are no subtrees.
+        """
+        optimal_subtree = self.get_optimal_subtree()
+        if optimal_subtree is None:
+            return None
+        return optimal_subtree.move
+
+    def insert_move_sequence(self, moves: list[int], win_probability: float = 0.0) -> None:
+        """Insert the given sequence of moves into this tree.
+
+        The win probabilities along the inserted path are updated from the last move back
+        to this node. If this is the root of a mirror-symmetric tree, the canonical orientation
+        of moves is inserted instead.
+        """
+        if self.is_symmetric():
+            moves = canonicalize_move_sequence(moves)
+        storage = self._storage
+        index = self._index
+        path = [index]
+        for move in moves:
+            subtree = storage.find_subtree(index, move)
+            if subtree == NO_NODE:
+                subtree = storage.add_subtree(index, move, not storage.is_yellow_moves[index],
+                                              win_probability)
+            index = subtree
+            path.append(index)
+
+        for index in reversed(path):
+            storage.update_win_probability(index)
+
+    def insert_many(self, games: Iterable[tuple[list[int], float]]) -> None:
+        """Insert every (moves, win_probability) pair of games into this tree, leaving it the
+        same as calling insert_move_sequence on each pair in order.
+
+        As in GameTree.insert_many, the moves are all added first and then each node that
+        gained a subtree, and its ancestors, is recalculated once, deepest first.
+        """
+        storage = self._storage
+        symmetric = self.is_symmetric()
+        changed_by_depth = []
+        changed = set()
+        for moves, win_probability in games:
+            if symmetric:
+                moves = canonicalize_move_sequence(moves)
+            index = self._index
+            path = [index]
+            linked_depth = None
+            for move in moves:
+                subtree = storage.find_subtree(index, move)
+                if subtree == NO_NODE:
+                    subtree = storage.add_subtree(index, move,
+                                                  not storage.is_yellow_moves[index],
+                                                  win_probability)
+                    if linked_depth is None:
+                        linked_depth = len(path) - 1
+                index = subtree
+                path.append(index)
+
+            if linked_depth is not None:
+                for depth in range(linked_depth, -1, -1):
+                    if path[depth] in changed:
+                        break
+                    changed.add(path[depth])
+                    while len(changed_by_depth) <= depth:
+                        changed_by_depth.append([])
+                    changed_by_depth[depth].append(path[depth])
+
+        for indices in reversed(changed_by_depth):
+            for index in indices:
+                storage.update_win_probability(index)
+
+    def merge(self, other: Union[GameTree, CompactGameTree]) -> None:
+        """Merge the moves and win probabilities learned by other into this tree.
+
+        The nodes of other are copied into this tree's storage, and the win probabilities are
+        recalculated as in GameTree.merge.
+
+        Preconditions:
+            - self.move == other.move
+            - self.player_selection == other.player_selection
+            - not other.has_transpositions()
+        """
+        if self.is_symmetric() != other.is_symmetric():
+            raise ValueError('Mirror-symmetric game trees can only be merged with each other')
+
+        storage = self._storage
+        for other_subtree in other.get_subtrees():
+            subtree = storage.find_subtree(self._index, other_subtree.move)
+            if subtree == NO_NODE:
+                subtree = storage.add_subtree(self._index, other_subtree.move,
+                                              other_subtree.is_yellow_move,
+                                              other_subtree.win_probability)
+            self._view(subtree).merge(other_subtree)
+        storage.update_win_probability(self._index)
+
 # if __name__ == "__main__":
 
 # import python_ta.contracts
@@ -12,8 +12,14 @@ This file has been modified from https://github.com/KeithGalli/Connect4-Python
 This file is Copyright (c) 2021 Shayaan Khan, Markus Nimi, Matthew Chan and Aabid Anas."""
 
 from __future__ import annotations
+from typing import Optional, Union
 import sys
 import math
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
 import tkinter as tk
 import numpy as np
 import pygame
@@ -21,20 +27,40 @@ import pygame
 import runner
 import connect3
 import gametree
+import treecache
+import treefile
 
 BLUE = (0, 0, 255)
 BLACK = (0, 0, 0)
 RED = (255, 0, 0)
 YELLOW = (255, 255, 0)
 
-ROW_COUNT = 4
-COLUMN_COUNT = 5
+# The board dimensions are defined once, in gametree (and re-exported by connect3)
+ROW_COUNT = connect3.ROW_COUNT
+COLUMN_COUNT = connect3.COLUMN_COUNT
 
 SQUARE_SIZE = 100
 WINDOW_WIDTH = COLUMN_COUNT * SQUARE_SIZE
 WINDOW_HEIGHT = (ROW_COUNT + 1) * SQUARE_SIZE
 WINDOW_SIZE = (WINDOW_WIDTH, WINDOW_HEIGHT)
 RADIUS = int(SQUARE_SIZE / 2 - 5)
+# The most frames drawn per second while the mouse moves over the board
+MAX_FPS = 60
+
+# Trees trained ahead of time with runner.runner_train_and_save, keyed by the colour the
+# human plays as. If a file is missing, a tree is trained when the game starts instead.
+PRETRAINED_TREE_FILES = {'Yellow': os.path.join('trees', 'yellow.c3gt'),
+                         'Red': os.path.join('trees', 'red.c3gt')}
+
+# Trees trained by the GUI are kept here, so that they are only trained once
+TREE_CACHE_DIRECTORY = os.path.join('trees', 'cache')
+
+TRAINING_GAMES = 20000
+# How often the background training reports its progress and saves a snapshot of the tree
+PROGRESS_INTERVAL = 500
+SNAPSHOT_INTERVAL = 2000
+# How often the GUI checks for progress from the background training, in milliseconds
+POLL_INTERVAL_MS = 100
 
 
 class MainGUI:
@@ -50,6 +76,16 @@ class MainGUI:
     ai_select1: tk.Radiobutton
     ai_select2: tk.Radiobutton
     play: tk.Button
+    progress_label: tk.Label
+    play_now: tk.Button
+    cancel: tk.Button
+    _training_process: Optional[multiprocessing.Process]
+    _training_queue: Optional[multiprocessing.Queue]
+    _snapshot_directory: Optional[str]
+    _snapshot_path: Optional[str]
+    _snapshot_ready: bool
+    _training_color: str
+    _tree_cache: treecache.TreeCache
 
     def __init__(self, main: tk.Tk) -> None:
         self.color_var = tk.StringVar(main, "Yellow")
@@ -86,48 +122,298 @@ class MainGUI:
         self.play = tk.Button(main, text="Play game", command=self.run_game)
         self.play.pack(padx=10, pady=10)
 
+        self.progress_label = tk.Label(text="")
+        self.progress_label.pack(padx=10)
+
+        self.play_now = tk.Button(main, text="Play now with partially trained AI",
+                                  command=self.play_with_snapshot, state=tk.DISABLED)
+        self.cancel = tk.Button(main, text="Cancel training", command=self.cancel_training)
+
+        self._training_process = None
+        self._training_queue = None
+        self._snapshot_directory = None
+        self._snapshot_path = None
+        self._snapshot_ready = False
+        self._training_color = "Yellow"
+        self._tree_cache = treecache.TreeCache(TREE_CACHE_DIRECTORY)
+
     def run_game(self) -> None:
-        """A method to run the game"""
+        """A method to run the game
+
+        If the optimized AI has no pretrained or cached tree, it is trained in a background
+        process and the game starts when training finishes.
+        """
         color_choice = self.color_var.get()
         ai_choice = self.ai_var.get()
         playing_gametree = None
         if ai_choice == "Optimized":
             ai_optimized = True
-            playing_gametree = runner.runner_train_and_play(20000, color_choice)
+            if os.path.exists(PRETRAINED_TREE_FILES[color_choice]):
+                playing_gametree = treefile.open_compact_game_tree(
+                    PRETRAINED_TREE_FILES[color_choice])
+            else:
+                playing_gametree = self._tree_cache.get(_training_cache_key(color_choice))
+                if playing_gametree is None:
+                    self.start_training(color_choice)
+                    return
         else:
             ai_optimized = False
         create_and_run_game(color_choice, ai_optimized, playing_gametree)
 
-
-def draw_board(board: np.ndarray, screen: pygame.display) -> None:
-    """Create the virtual Connect3 board that we play in.
+    def start_training(self, color_choice: str) -> None:
+        """Start training a tree for a human playing as color_choice in a background process,
+        and show its progress in the window.
+        """
+        if self._training_process is not None:
+            return
+
+        self._training_color = color_choice
+        self._snapshot_directory = tempfile.mkdtemp()
+        self._snapshot_path = os.path.join(self._snapshot_directory, 'snapshot.c3gt')
+        self._snapshot_ready = False
+        self._training_queue = multiprocessing.Queue()
+        self._training_process = multiprocessing.Process(
+            target=train_in_background,
+            args=(TRAINING_GAMES, color_choice, self._snapshot_path, self._training_queue),
+            daemon=True)
+        self._training_process.start()
+
+        self.play.config(state=tk.DISABLED)
+        self.play_now.config(state=tk.DISABLED)
+        self.play_now.pack(padx=10, pady=5)
+        self.cancel.pack(padx=10, pady=5)
+        self.progress_label.config(text="Training the AI...")
+        self.main.after(POLL_INTERVAL_MS, self.poll_training)
+
+    def poll_training(self) -> None:
+        """Show any progress reported by the background training, and start the game once it
+        has finished. This is called from the Tk event loop, so it never blocks.
+        """
+        if self._training_process is None:
+            return
+
+        finished = self._read_training_progress()
+        is_alive = finished or self._training_process.is_alive()
+        if not is_alive:
+            # The process may have reported that it finished after the queue was read and
+            # then exited, so read the queue again before deciding that it failed
+            finished = self._read_training_progress()
+
+        if finished:
+            playing_gametree = self._stop_training()
+            self.progress_label.config(text="")
+            self._tree_cache.put(_training_cache_key(self._training_color), playing_gametree)
+            create_and_run_game(self._training_color, True, playing_gametree)
+        elif not is_alive:
+            self._stop_training()
+            self.progress_label.config(text="Training stopped unexpectedly")
+        else:
+            self.main.after(POLL_INTERVAL_MS, self.poll_training)
+
+    def _read_training_progress(self) -> bool:
+        """Show every progress report waiting in the training queue, and return whether one
+        of them reported that the training has finished.
+        """
+        finished = False
+        while not self._training_queue.empty():
+            progress = self._training_queue.get_nowait()
+            self.progress_label.config(
+                text=f"Games: {progress['games']} / {TRAINING_GAMES}    "
+                     f"Speed: {progress['games_per_second']:.0f} games/s    "
+                     f"AI win rate: {100 * progress['win_rate']:.1f}%")
+            if progress['snapshot']:
+                self._snapshot_ready = True
+                self.play_now.config(state=tk.NORMAL)
+            finished = finished or progress['done']
+        return finished
+
+    def play_with_snapshot(self) -> None:
+        """Stop the background training and play against the latest snapshot of the tree."""
+        if self._snapshot_ready:
+            playing_gametree = self._stop_training()
+            self.progress_label.config(text="")
+            create_and_run_game(self._training_color, True, playing_gametree)
+
+    def cancel_training(self) -> None:
+        """Stop the background training without playing."""
+        self._stop_training()
+        self.progress_label.config(text="Training cancelled")
+
+    def close(self) -> None:
+        """Stop the background training, if any, and delete its snapshots. This is called
+        after the window is closed.
+        """
+        self._end_training()
+
+    def _stop_training(self) -> Optional[gametree.CompactGameTree]:
+        """Stop the background training process, if it is running, reset the window and
+        delete the snapshot directory.
+
+        Return the latest snapshot of the tree, read into memory before its file is deleted,
+        or None if no snapshot was saved.
+        """
+        self.play.config(state=tk.NORMAL)
+        self.play_now.pack_forget()
+        self.cancel.pack_forget()
+        return self._end_training()
+
+    def _end_training(self) -> Optional[gametree.CompactGameTree]:
+        """Stop the background training process, if it is running, and delete the snapshot
+        directory, without changing the window.
+
+        Return the latest snapshot as in _stop_training.
+        """
+        if self._training_process is not None and self._training_process.is_alive():
+            self._training_process.terminate()
+            self._training_process.join()
+        self._training_process = None
+        self._training_queue = None
+
+        snapshot = None
+        if self._snapshot_ready:
+            snapshot = treefile.open_compact_game_tree(self._snapshot_path, writable=True)
+        if self._snapshot_directory is not None:
+            shutil.rmtree(self._snapshot_directory, ignore_errors=True)
+        self._snapshot_directory = None
+        self._snapshot_path = None
+        self._snapshot_ready = False
+        return snapshot
+
+
+def _training_cache_key(color_choice: str) -> str:
+    """Return the key of the tree trained by train_in_background in the tree cache."""
+    return treecache.make_cache_key(TRAINING_GAMES, color_choice,
+                                    runner.train_and_play_probabilities(TRAINING_GAMES), None)
+
+
+def train_in_background(games: int, color_choice: str, snapshot_path: str,
+                        progress_queue: multiprocessing.Queue) -> None:
+    """Train a tree for a human playing as color_choice in the same way as
+    runner.runner_train_and_play. This is run in a separate process by MainGUI.
+
+    Every PROGRESS_INTERVAL games, a dictionary with the number of games played so far, the
+    games per second, the win rate of the AI over the last PROGRESS_INTERVAL games, whether a
+    new snapshot was saved and whether training is done is put in progress_queue, followed by
+    a final one when training is done. Snapshots of the tree are saved to snapshot_path every
+    SNAPSHOT_INTERVAL games, and when training ends unless the last one has the same games.
     """
+    start_time = time.perf_counter()
+    latest_statistics = [connect3.GameStatistics(color_choice)]
+    # The number of games in the last snapshot saved, or None if none has been
+    snapshot_games = [None]
+
+    def report_progress(games_played: int, game_tree: gametree.GameTree,
+                        statistics: connect3.GameStatistics, done: bool = False) -> None:
+        """Report the progress of the training and save a snapshot if it is time to."""
+        latest_statistics[0] = statistics
+        recent_start = max(len(statistics) - PROGRESS_INTERVAL, 0)
+        recent_games = len(statistics) - recent_start
+        ai_wins = statistics.count(statistics.computer, recent_start)
+        # The final snapshot is skipped if the last interval already saved the same games
+        is_snapshot = (done or games_played % SNAPSHOT_INTERVAL == 0) \
+            and snapshot_games[0] != games_played
+        if is_snapshot:
+            snapshot_games[0] = games_played
+            # Write to a temporary file first so that a snapshot is never read half-written
+            treefile.save_game_tree(game_tree, snapshot_path + '.tmp')
+            os.replace(snapshot_path + '.tmp', snapshot_path)
+        progress_queue.put({'games': games_played,
+                            'games_per_second': games_played / (time.perf_counter() - start_time),
+                            'win_rate': ai_wins / max(recent_games, 1),
+                            'snapshot': is_snapshot,
+                            'done': done})
+
+    probabilities = runner.train_and_play_probabilities(games)
+    # The statistics are shown by the GUI, so the background process must not open a plot
+    game_tree = runner.run_learning_algorithm(probabilities, color_choice, show_stats=False,
+                                              progress_callback=report_progress,
+                                              progress_interval=PROGRESS_INTERVAL)
+    report_progress(len(probabilities), game_tree, latest_statistics[0], done=True)
+
+
+def render_background() -> pygame.Surface:
+    """Return a surface with the empty board, drawn once and then copied to the screen."""
+    background = pygame.Surface(WINDOW_SIZE)
+    background.fill(BLACK)
     for c in range(COLUMN_COUNT):
         for r in range(ROW_COUNT):
-            pygame.draw.rect(screen, BLUE,
+            pygame.draw.rect(background, BLUE,
                              (c * SQUARE_SIZE, r * SQUARE_SIZE + SQUARE_SIZE,
                               SQUARE_SIZE, SQUARE_SIZE))
-            pygame.draw.circle(screen, BLACK, (
+            pygame.draw.circle(background, BLACK, (
                 int(c * SQUARE_SIZE + SQUARE_SIZE / 2),
                 int(r * SQUARE_SIZE + SQUARE_SIZE + SQUARE_SIZE / 2)), RADIUS)
+    return background
+
+
+def draw_disc(screen: pygame.Surface, row: int, column: int, color: tuple) -> pygame.Rect:
+    """Draw a disc of the given color in the cell at row (counted from the bottom) and column,
+    and return the rectangle of the cell, which must be updated on the display.
+    """
+    pygame.draw.circle(screen, color, (
+        int(column * SQUARE_SIZE + SQUARE_SIZE / 2),
+        WINDOW_HEIGHT - int(row * SQUARE_SIZE + SQUARE_SIZE / 2)), RADIUS)
+    return pygame.Rect(column * SQUARE_SIZE, WINDOW_HEIGHT - (row + 1) * SQUARE_SIZE,
+                       SQUARE_SIZE, SQUARE_SIZE)
+
+
+def draw_hover(screen: pygame.Surface, x: Optional[int], color: tuple) -> pygame.Rect:
+    """Clear the row above the board and, if x is given, draw a disc of the given color above
+    the mouse at x. Return the rectangle of the row, which must be updated on the display.
+    """
+    hover_row = pygame.Rect(0, 0, WINDOW_WIDTH, SQUARE_SIZE)
+    pygame.draw.rect(screen, BLACK, hover_row)
+    if x is not None:
+        pygame.draw.circle(screen, color, (x, int(SQUARE_SIZE / 2)), RADIUS)
+    return hover_row
+
 
+def draw_board(board: np.ndarray, screen: pygame.Surface,
+               background: Optional[pygame.Surface] = None) -> None:
+    """Create the virtual Connect3 board that we play in.
+
+    The whole window is redrawn, from background if it is given, so this is only used when
+    the game starts. Moves are drawn with draw_disc.
+    """
+    if background is None:
+        background = render_background()
+    screen.blit(background, (0, 0))
     for c in range(COLUMN_COUNT):
         for r in range(ROW_COUNT):
             if board[r][c] == 2:
-                pygame.draw.circle(screen, RED, (
-                    int(c * SQUARE_SIZE + SQUARE_SIZE / 2),
-                    WINDOW_HEIGHT - int(r * SQUARE_SIZE + SQUARE_SIZE / 2)), RADIUS)
+                draw_disc(screen, r, c, RED)
             elif board[r][c] == 1:
-                pygame.draw.circle(screen, YELLOW, (
-                    int(c * SQUARE_SIZE + SQUARE_SIZE / 2),
-                    WINDOW_HEIGHT - int(r * SQUARE_SIZE + SQUARE_SIZE / 2)), RADIUS)
+                draw_disc(screen, r, c, YELLOW)
     pygame.display.update()
 
 
+def _wait_for_quit() -> None:
+    """Block until the window is closed, then exit."""
+    while True:
+        if pygame.event.wait().type == pygame.QUIT:
+            sys.exit()
+
+
+def _drop_disc(connect3_game: connect3.Connect3Game, column: int, screen: pygame.Surface,
+               color: tuple) -> pygame.Rect:
+    """Make the move in column in connect3_game, draw its disc and return the dirty rectangle.
+
+    Preconditions:
+        - column in connect3_game.get_valid_moves()
+    """
+    row = int(np.count_nonzero(connect3_game.get_board()[:, column]))
+    connect3_game.make_move(column)
+    return draw_disc(screen, row, column, color)
+
+
 def create_and_run_game(player_color: str, ai_is_optimal: bool,
-                        game_tree: gametree.GameTree) -> None:
+                        game_tree: Union[gametree.GameTree, gametree.CompactGameTree]) -> None:
     """Create a pop up window to visualize a game with the player against the AI
 
+    The window only wakes up for events: while waiting for the player it blocks on the event
+    queue, and only the parts of the window that changed are updated, at most MAX_FPS times
+    per second.
+
     Parameters:
         - player_color: the color that the player chooses
         - ai_is_optimal: whether we are using an ExploringPlayer or RandomPlayer
@@ -140,9 +426,10 @@ def create_and_run_game(player_color: str, ai_is_optimal: bool,
     pygame.init()
     FONT = pygame.font.SysFont("monospace", 85)
     screen = pygame.display.set_mode(WINDOW_SIZE)
+    pygame.event.set_allowed([pygame.QUIT, pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN])
+    clock = pygame.time.Clock()
     connect3_game = connect3.Connect3Game()
-    draw_board(connect3_game.get_board(), screen)
-    pygame.display.update()
+    draw_board(connect3_game.get_board(), screen, render_background())
     game_over = False
     turn = 1
 
@@ -152,71 +439,69 @@ def create_and_run_game(player_color: str, ai_is_optimal: bool,
     # if player is red, ai goes first -> odd turn is player
 
     ai = connect3.ExploringPlayer(game_tree, 0) if ai_is_optimal else connect3.RandomPlayer()
+    # Compute the AI's replies while the player is choosing a move
+    ai = connect3.PonderingPlayer(ai)
+    if player_color == "Yellow":
+        ai.ponder(connect3_game)
 
     while not game_over:
+        color = RED if turn == 0 else YELLOW
         if ((turn % 2) == 0 and player_color == "Red") or (
                 (turn % 2) == 1 and player_color == "Yellow"):
-            # Player turn
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    # Quit game event
-                    sys.exit()
-                elif event.type == pygame.MOUSEMOTION:
+            # Player turn: sleep until there is an event
+            events = [pygame.event.wait()] + pygame.event.get()
+            if any(event.type == pygame.QUIT for event in events):
+                # Quit game event: cancel the queued pondering first, so that it does not
+                # delay the exit
+                ai.close()
+                sys.exit()
+
+            dirty_rects = []
+            # Only the last mouse position matters, so skip older motion events
+            motions = [event for event in events if event.type == pygame.MOUSEMOTION]
+            for event in events:
+                if event.type == pygame.MOUSEMOTION and event is motions[-1]:
                     # Mouse move event
-                    pygame.draw.rect(screen, BLACK, (0, 0, WINDOW_WIDTH, SQUARE_SIZE))
-                    pygame.draw.circle(screen, RED if turn == 0 else YELLOW,
-                                       (event.pos[0], int(SQUARE_SIZE / 2)), RADIUS)
-                    pygame.display.update()
+                    dirty_rects.append(draw_hover(screen, event.pos[0], color))
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     # Mouse click event
-                    pygame.draw.rect(screen, BLACK, (0, 0, WINDOW_WIDTH, SQUARE_SIZE))
-                    connect3_game.update_valid_moves()
-
-                    if int(math.floor(event.pos[0] / SQUARE_SIZE)) in \
-                            connect3_game.get_valid_moves():
+                    column = int(math.floor(event.pos[0] / SQUARE_SIZE))
+                    if column in connect3_game.get_valid_moves():
                         # If the move is valid, drop piece and
                         # check win conditions for the given turn
-                        connect3_game.make_move(int(math.floor(event.pos[0] / SQUARE_SIZE)))
-
-                        color = RED if turn == 0 else YELLOW
-
-                        previous_human_move = int(math.floor(event.pos[0] / SQUARE_SIZE))
+                        dirty_rects.append(draw_hover(screen, None, color))
+                        dirty_rects.append(_drop_disc(connect3_game, column, screen, color))
+                        previous_human_move = column
 
                         if connect3_game.get_winner() is not None:
                             screen.blit(FONT.render("You win!", True, color), (60, 10))
                             game_over = True
 
-                        draw_board(connect3_game.get_board(), screen)
                         turn = (turn + 1) % 2
+                        # Later clicks were made before the AI's move, so ignore them
+                        break
 
-                        if game_over:
-                            while True:
-                                pygame.event.wait()
-                                for event2 in pygame.event.get():
-                                    if event2.type == pygame.QUIT:
-                                        sys.exit()
+            pygame.display.update(dirty_rects)
+            clock.tick(MAX_FPS)
         else:
             # AI turn
             prev_turn = previous_human_move
-            connect3_game.update_valid_moves()
-            connect3_game.make_move(ai.make_move(connect3_game, prev_turn))
-
-            # Set the player and colour for the turn
-            color = RED if turn == 0 else YELLOW
+            dirty_rect = _drop_disc(connect3_game, ai.make_move(connect3_game, prev_turn),
+                                    screen, color)
+            dirty_rects = [dirty_rect]
 
             if connect3_game.get_winner() is not None:
+                dirty_rects.append(draw_hover(screen, None, color))
                 screen.blit(FONT.render("AI wins!", True, color), (40, 10))
                 game_over = True
 
-            draw_board(connect3_game.get_board(), screen)
+            pygame.display.update(dirty_rects)
             turn = (turn + 1) % 2
+            if not game_over:
+                ai.ponder(connect3_game)
 
-            if game_over:
-                while True:
-                    pygame.event.wait()
-                    for event2 in pygame.event.get():
-                        if event2.type == pygame.QUIT:
-                            sys.exit()
+    ai.close()
+    _wait_for_quit()
 
 
 if __name__ == "__main__":
@@ -224,6 +509,7 @@ if __name__ == "__main__":
     root = tk.Tk()
     gui = MainGUI(root)
     root.mainloop()
+    gui.close()
 
     # import python_ta.contracts
     # python_ta.contracts.check_all_contracts()
@@ -231,7 +517,9 @@ if __name__ == "__main__":
     # import python_ta
     # python_ta.check_all(config={
     #     'extra-imports': ["sys", "math", "tkinter",
-    #                       "numpy", "pygame", "runner", "connect3", "gametree"],
+    #                       "numpy", "pygame", "runner", "connect3", "gametree",
+    #                       "treefile", "treecache", "os", "multiprocessing", "shutil",
+    #                       "tempfile", "time", "typing"],
     #     'allowed-io': ["runner.run_learning_algorithm"],
     #     'max-line-length': 100,
     #     'disable': ['E1136']
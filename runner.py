@@ -10,89 +10,351 @@ expressly prohibited.
 
 This file is Copyright (c) 2021 Shayaan Khan, Markus Nimi, Matthew Chan and Aabid Anas."""
 
+import multiprocessing
+import random
+import time
+from typing import Callable, Optional, Union
+import numpy as np
 import connect3
+import gamelog
 import gametree
+import schedules
+import telemetry
+import treecache
+import treefile
 
+# A function called with the number of games played so far, the game tree and the statistics
+# of the games so far
+ProgressCallback = Callable[[int, Union[gametree.GameTree, gametree.CompactGameTree],
+                             connect3.GameStatistics], None]
+# The exploration probability of each game, as a list or a schedule computing them lazily
+ExplorationProbabilities = Union[list[float], schedules.ExplorationSchedule]
 
-def run_learning_algorithm(exploration_probabilities: list[float], player_selection: str,
-                           show_stats: bool = True) -> gametree.GameTree:
+
+def run_learning_algorithm(exploration_probabilities: ExplorationProbabilities,
+                           player_selection: str,
+                           show_stats: bool = True,
+                           use_bitboard: bool = False,
+                           batch_size: Optional[int] = None,
+                           processes: int = 1,
+                           transpositions: bool = False,
+                           compact: bool = False,
+                           progress_callback: Optional[ProgressCallback] = None,
+                           progress_interval: int = 1000,
+                           seed: Optional[int] = None,
+                           training_telemetry: Optional[telemetry.TrainingTelemetry] = None,
+                           node_budget: Optional[int] = None,
+                           symmetric: bool = False,
+                           game_log: Optional[gamelog.GameLogWriter] = None,
+                           early_stopping: Optional[schedules.EarlyStopping] = None) \
+        -> Union[gametree.GameTree, gametree.CompactGameTree]:
     """ Play a sequence of Connect3 games using an ExploringPlayer based on the selected player.
 
+    If use_bitboard is True, the games are played on the faster BitboardConnect3Game engine.
+
+    If batch_size is given, consecutive games with an exploration probability of 1.0 (where
+    both players move randomly) are simulated up to batch_size at a time by
+    connect3.run_random_games, and inserted into the tree together with insert_many. The
+    tree passed to progress_callback may then already contain the rest of the game's batch.
+
+    If processes > 1, the games are split between that many worker processes. Worker k plays
+    every processes-th game starting from game k into its own GameTree, and the trees are
+    then merged into one with GameTree.merge.
+
+    If transpositions is True, a transposition-aware GameTree is trained, where every move order
+    reaching the same position shares its statistics. These trees cannot be merged, so
+    processes must be 1.
+
+    If compact is True, a gametree.CompactGameTree is trained instead, which stores its nodes in
+    typed arrays and uses much less memory.
+
+    If progress_callback is given, it is called every progress_interval games with the number
+    of games played so far, the game tree and the connect3.GameStatistics of the games so far.
+    It is only called when processes == 1.
+
+    If seed is given, the games are reproducible: the random number generators are seeded with
+    seed (plus k in worker process k).
+
+    If training_telemetry is given, it records the progress of the training. Like
+    progress_callback, it can only be used when processes == 1.
+
+    If node_budget is given, the GameTree is kept to at most node_budget nodes by evicting its
+    least visited subtrees (see gametree.GameTree).
+
+    If symmetric is True, a mirror-symmetric tree is trained, which learns each game and its
+    mirror image in the same nodes (see gametree.GameTree).
+
+    If game_log is given, every game is appended to it, so that the games can be replayed
+    later with gamelog.replay_game_log. Like progress_callback, it can only be used when
+    processes == 1.
+
+    If early_stopping is given, training ends as soon as it reports that the root of the
+    tree has converged, and the remaining games are not played. The statistics then cover
+    the games played. Like progress_callback, it can only be used when processes == 1.
+
     Preconditions:
         - player_selection in {'Red', 'Yellow'}
         - all(0.0 <= probability <= 1.0 for probability in exploration_probabilities)
+        - processes >= 1
+        - not transpositions or processes == 1
+        - not (transpositions and compact)
+        - training_telemetry is None or processes == 1
+        - node_budget is None or not (transpositions or compact)
+        - not (transpositions and symmetric)
+        - game_log is None or processes == 1
+        - early_stopping is None or processes == 1
     """
-    game_tree = gametree.GameTree(player_selection)
-
-    results_so_far = []
-    count = []
-    for i in range(0, len(exploration_probabilities)):
-        if player_selection == 'Red':
-            yellow_player = connect3.ExploringPlayer(game_tree, exploration_probabilities[i])
-            red_player = connect3.RandomPlayer()
-        else:
-            red_player = connect3.ExploringPlayer(game_tree, exploration_probabilities[i])
-            yellow_player = connect3.RandomPlayer()
-        winner, moves = connect3.run_game(yellow_player, red_player)
-        if winner == player_selection:
-            win_prob = 0.0
-        elif winner == "Draw":
-            win_prob = 0.5
-        else:
-            win_prob = 1.0
-        count.append(winner)
-        game_tree.insert_move_sequence(moves, win_prob)
-        results_so_far.append(winner)
+    # The arguments of _play_learning_games shared by every process. The per-process
+    # arguments are left at their defaults in worker processes, which the preconditions
+    # require to be unused when processes > 1.
+    arguments = {'player_selection': player_selection, 'use_bitboard': use_bitboard,
+                 'batch_size': batch_size, 'transpositions': transpositions,
+                 'compact': compact, 'node_budget': node_budget, 'symmetric': symmetric}
+    if processes == 1:
+        game_tree, statistics = _play_learning_games(
+            exploration_probabilities, progress_callback=progress_callback,
+            progress_interval=progress_interval, seed=seed,
+            training_telemetry=training_telemetry, game_log=game_log,
+            early_stopping=early_stopping, **arguments)
+    else:
+        shards = [dict(arguments, exploration_probabilities=exploration_probabilities[k::processes],
+                       seed=None if seed is None else seed + k)
+                  for k in range(processes)]
+        with multiprocessing.Pool(processes) as pool:
+            shard_results = pool.map(_play_learning_shard, shards)
+
+        game_tree = shard_results[0][0]
+        winners = [''] * len(exploration_probabilities)
+        for k, (shard_tree, shard_statistics) in enumerate(shard_results):
+            if k > 0:
+                game_tree.merge(shard_tree)
+            winners[k::processes] = shard_statistics.get_winners()
+        statistics = connect3.GameStatistics(player_selection)
+        statistics.add_results(winners)
 
     if show_stats:
-        connect3.plot_game_statistics(results_so_far, player_selection)
+        statistics.plot()
 
-    last_20_percent = count[round(len(exploration_probabilities) * 0.8):]
+    games = len(statistics)
+    last_20_percent_start = round(games * 0.8)
+    last_20_percent_length = games - last_20_percent_start
 
     print("========== ExploringPlayer Learning Algorithm Results (Playing against "
           + str(player_selection) + ") ==========")
 
-    print("---Cumulative:---")
+    # Training can stop early, even before the last 20% of games has any games in it
+    if games > 0:
+        print("---Cumulative:---")
 
-    print("Red: " + str(count.count('Red')) + " (" + str(100 * count.count('Red')
-                                                         / len(exploration_probabilities)) + "%)")
-    print("Yellow: " + str(count.count('Yellow')) + " (" + str(100 * count.count('Yellow')
-                                                               / len(exploration_probabilities))
-          + "%)")
-    print("---Last 20% of games:---")
+        print("Red: " + str(statistics.count('Red')) + " (" + str(
+            100 * statistics.count('Red') / games) + "%)")
+        print("Yellow: " + str(statistics.count('Yellow')) + " (" + str(
+            100 * statistics.count('Yellow') / games) + "%)")
 
-    print("Red: " + str(last_20_percent.count('Red')) + " (" + str(
-        100 * last_20_percent.count('Red')
-        / len(last_20_percent)) + "%)")
-    print("Yellow: " + str(last_20_percent.count('Yellow')) + " (" + str(
-        100 * last_20_percent.count('Yellow')
-        / len(last_20_percent)) + "%)")
+    if last_20_percent_length > 0:
+        print("---Last 20% of games:---")
+
+        print("Red: " + str(statistics.count('Red', last_20_percent_start)) + " (" + str(
+            100 * statistics.count('Red', last_20_percent_start)
+            / last_20_percent_length) + "%)")
+        print("Yellow: " + str(statistics.count('Yellow', last_20_percent_start)) + " (" + str(
+            100 * statistics.count('Yellow', last_20_percent_start)
+            / last_20_percent_length) + "%)")
 
     return game_tree
 
 
-def runner_train_and_play(games: int, tree_player: str) -> gametree.GameTree:
+def _play_learning_games(exploration_probabilities: ExplorationProbabilities,
+                         player_selection: str,
+                         use_bitboard: bool, batch_size: Optional[int],
+                         transpositions: bool, compact: bool,
+                         progress_callback: Optional[ProgressCallback] = None,
+                         progress_interval: int = 1000,
+                         seed: Optional[int] = None,
+                         training_telemetry: Optional[telemetry.TrainingTelemetry] = None,
+                         node_budget: Optional[int] = None,
+                         symmetric: bool = False,
+                         game_log: Optional[gamelog.GameLogWriter] = None,
+                         early_stopping: Optional[schedules.EarlyStopping] = None) \
+        -> tuple[Union[gametree.GameTree, gametree.CompactGameTree], connect3.GameStatistics]:
+    """Play the games of run_learning_algorithm in this process.
+
+    Return the trained game tree and the statistics of the games.
+    """
+    if seed is not None:
+        random.seed(seed)
+    rng = np.random.default_rng(seed)
+
+    if compact:
+        game_tree = gametree.CompactGameTree(player_selection, symmetric=symmetric)
+    else:
+        game_tree = gametree.GameTree(player_selection, transpositions=transpositions,
+                                      node_budget=node_budget, symmetric=symmetric)
+
+    statistics = connect3.GameStatistics(player_selection)
+    if training_telemetry is not None:
+        training_telemetry.start()
+    if early_stopping is not None:
+        early_stopping.reset()
+
+    i = 0
+    while i < len(exploration_probabilities):
+        start_time = time.perf_counter()
+        if batch_size is not None and exploration_probabilities[i] == 1.0:
+            # Both players move randomly, so simulate a block of these games at once
+            end = i
+            while end < len(exploration_probabilities) and end - i < batch_size \
+                    and exploration_probabilities[end] == 1.0:
+                end += 1
+            winners, move_sequences = connect3.run_random_games(end - i, rng)
+            i = end
+        else:
+            if player_selection == 'Red':
+                yellow_player = connect3.ExploringPlayer(game_tree, exploration_probabilities[i])
+                red_player = connect3.RandomPlayer()
+            else:
+                red_player = connect3.ExploringPlayer(game_tree, exploration_probabilities[i])
+                yellow_player = connect3.RandomPlayer()
+            winner, moves = connect3.run_game(yellow_player, red_player, use_bitboard)
+            winners, move_sequences = [winner], [moves]
+            i += 1
+        run_game_seconds = (time.perf_counter() - start_time) / len(winners)
+
+        # A batch of games is inserted at once with insert_many, which only calculates each
+        # node's win probability once. A single game is inserted directly, since
+        # insert_move_sequence stops updating the path once a win probability is unchanged.
+        insert_start_time = time.perf_counter()
+        if len(winners) == 1:
+            game_tree.insert_move_sequence(move_sequences[0],
+                                           connect3.score_game(winners[0], player_selection))
+        else:
+            game_tree.insert_many((moves, connect3.score_game(winner, player_selection))
+                                  for winner, moves in zip(winners, move_sequences))
+        insert_seconds = (time.perf_counter() - insert_start_time) / len(winners)
+
+        for winner, moves in zip(winners, move_sequences):
+            if training_telemetry is not None:
+                training_telemetry.add_game(run_game_seconds, insert_seconds, game_tree)
+            statistics.add_result(winner)
+            if game_log is not None:
+                game_log.write_game(winner, moves)
+            if progress_callback is not None and len(statistics) % progress_interval == 0:
+                progress_callback(len(statistics), game_tree, statistics)
+
+        if early_stopping is not None and early_stopping.update(len(statistics), game_tree):
+            break
+
+    if training_telemetry is not None:
+        training_telemetry.finish(game_tree)
+    return game_tree, statistics
+
+
+def _play_learning_shard(shard: dict) \
+        -> tuple[Union[gametree.GameTree, gametree.CompactGameTree], connect3.GameStatistics]:
+    """Play one worker process's share of the games of run_learning_algorithm.
+
+    shard maps the names of arguments of _play_learning_games to their values.
+    """
+    # Worker processes may be forked with the parent's random state, so reseed them
+    random.seed()
+    return _play_learning_games(**shard)
+
+
+def train_and_play_probabilities(games: int) -> schedules.StepSchedule:
+    """Return the exploration probabilities used by runner_train_and_play: the AI trains for
+    80% of games and plays optimally for the last 20%.
+    """
+    return schedules.StepSchedule([(int(games * 0.8), 1.0), (int(games * 0.2), 0.0)])
+
+
+def _train_with_cache(games: int, tree_player: str, probabilities: ExplorationProbabilities,
+                      show_stats: bool, processes: int, cache: Optional[treecache.TreeCache],
+                      seed: Optional[int],
+                      early_stopping: Optional[schedules.EarlyStopping] = None) \
+        -> Union[gametree.GameTree, gametree.CompactGameTree]:
+    """Return a tree trained by run_learning_algorithm with the given parameters.
+
+    If cache is given and already contains a tree trained with the same parameters, that
+    tree is returned as a read-only, memory-mapped CompactGameTree instead, and no
+    statistics are shown. It can be played against but cannot learn more games. Otherwise
+    the newly trained tree is added to the cache.
+    """
+    if cache is not None:
+        key = treecache.make_cache_key(
+            games, tree_player, probabilities, seed,
+            None if early_stopping is None else early_stopping.parameters())
+        cached_tree = cache.get(key)
+        if cached_tree is not None:
+            return cached_tree
+
+    game_tree = run_learning_algorithm(probabilities, tree_player, show_stats=show_stats,
+                                       processes=processes, seed=seed,
+                                       early_stopping=early_stopping)
+    if cache is not None:
+        cache.put(key, game_tree)
+    return game_tree
+
+
+def runner_train_and_play(games: int, tree_player: str, processes: int = 1,
+                          cache: Optional[treecache.TreeCache] = None,
+                          seed: Optional[int] = None,
+                          early_stopping: Optional[schedules.EarlyStopping] = None) \
+        -> Union[gametree.GameTree, gametree.CompactGameTree]:
     """Run example with the player as the exploring player, where the AI
     Trains for 80% of games and plays optimally for the last 20%
 
+    The games are split between the given number of worker processes. If cache is given, a
+    tree trained with the same parameters is reused instead of being retrained, and returned
+    as a read-only CompactGameTree that cannot learn more games. If early_stopping is given,
+    training ends once the tree has converged, which may be before all the games are played.
+
     Preconditions:
         - tree_player in {'Red', 'Yellow'}
+        - early_stopping is None or processes == 1
     """
 
-    probabilities = [1.0] * int(games * 0.8) + [0.0] * int(games * 0.2)
-    return run_learning_algorithm(probabilities, tree_player)
+    probabilities = train_and_play_probabilities(games)
+    return _train_with_cache(games, tree_player, probabilities, True, processes, cache, seed,
+                             early_stopping)
 
 
-def runner_train_only(games: int, tree_player: str) -> gametree.GameTree:
+def runner_train_only(games: int, tree_player: str, processes: int = 1,
+                      cache: Optional[treecache.TreeCache] = None,
+                      seed: Optional[int] = None,
+                      early_stopping: Optional[schedules.EarlyStopping] = None) \
+        -> Union[gametree.GameTree, gametree.CompactGameTree]:
     """Run example with the player as the exploring player, where the AI
     Trains for 80% of games and plays optimally for the last 20%
 
+    The games are split between the given number of worker processes. If cache is given, a
+    tree trained with the same parameters is reused instead of being retrained, and returned
+    as a read-only CompactGameTree that cannot learn more games. If early_stopping is given,
+    training ends once the tree has converged, which may be before all the games are played.
+
     Preconditions:
         - tree_player in {'Red', 'Yellow'}
+        - early_stopping is None or processes == 1
     """
 
-    probabilities = [1.0] * games
-    return run_learning_algorithm(probabilities, tree_player)
+    probabilities = schedules.ConstantSchedule(1.0, games)
+    return _train_with_cache(games, tree_player, probabilities, True, processes, cache, seed,
+                             early_stopping)
+
+
+def runner_train_and_save(games: int, tree_player: str, path: str,
+                          processes: int = 1) -> gametree.GameTree:
+    """Train a tree in the same way as runner_train_and_play and save it to the file at path,
+    so that it can be loaded with treefile.open_compact_game_tree instead of retrained.
+
+    Preconditions:
+        - tree_player in {'Red', 'Yellow'}
+    """
+    probabilities = train_and_play_probabilities(games)
+    game_tree = run_learning_algorithm(probabilities, tree_player, show_stats=False,
+                                       processes=processes)
+    treefile.save_game_tree(game_tree, path)
+    return game_tree
+
 
 # if __name__ == "__main__":
 #     import python_ta.contracts
@@ -100,7 +362,10 @@ def runner_train_only(games: int, tree_player: str) -> gametree.GameTree:
 
 #     import python_ta
 #     python_ta.check_all(config={
-#         'extra-imports': ['connect3', 'gametree'],  # the names (strs) of imported modules
+#         'extra-imports': ['connect3', 'gamelog', 'gametree', 'schedules', 'telemetry',
+#                           'treecache', 'treefile', 'multiprocessing', 'random', 'time',
+#                           'numpy'],
+#         # the names (strs) of imported modules
 #         'allowed-io': ['run_learning_algorithm'],
 #         # the names (strs) of functions that call print/open/input
 #         'max-line-length': 100,
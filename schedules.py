@@ -0,0 +1,324 @@
+"""CSC111 Winter 2021: Project Phase 2
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students and Faculty
+involved in CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited.
+
+This file is Copyright (c) 2021 Shayaan Khan, Markus Nimi, Matthew Chan and Aabid Anas.
+
+Exploration schedules and early stopping for runner.run_learning_algorithm.
+
+An ExplorationSchedule gives the exploration probability of each game of a training run. It
+computes each probability when it is needed instead of storing a list of them, and can be
+used anywhere a list of probabilities is accepted: it has a length, can be indexed and
+sliced, and iterates over its probabilities in order.
+
+An EarlyStopping ends a training run once the root of the game tree has converged: once its
+optimal move and win probability have stayed the same for a window of games.
+"""
+from __future__ import annotations
+import math
+from typing import Iterator, Optional, Union
+
+import gametree
+
+
+class ExplorationSchedule:
+    """An abstract schedule of exploration probabilities for a number of games.
+
+    Instance Attributes:
+        - games: the number of games in the schedule
+
+    Representation Invariants:
+        - self.games >= 0
+    """
+    games: int
+
+    def __init__(self, games: int) -> None:
+        """Initialize a schedule of the given number of games.
+
+        Preconditions:
+            - games >= 0
+        """
+        self.games = games
+
+    def probability(self, game: int) -> float:
+        """Return the exploration probability of the given game, numbered from 0.
+
+        Preconditions:
+            - 0 <= game < self.games
+        """
+        raise NotImplementedError
+
+    def parameters(self) -> dict:
+        """Return the kind and the parameters of this schedule, which identify its
+        probabilities without computing them, e.g. to identify trained trees.
+        """
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        """Return the number of games in this schedule."""
+        return self.games
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[float, list[float]]:
+        """Return the exploration probability of game index, or a list of the probabilities
+        of the games in a slice.
+
+        Raise IndexError if index is out of range.
+        """
+        if isinstance(index, slice):
+            return [self.probability(game) for game in range(*index.indices(self.games))]
+        if index < 0:
+            index += self.games
+        if not 0 <= index < self.games:
+            raise IndexError('Game ' + str(index) + ' is outside the schedule')
+        return self.probability(index)
+
+    def __iter__(self) -> Iterator[float]:
+        """Yield the exploration probability of each game in order."""
+        for game in range(self.games):
+            yield self.probability(game)
+
+
+class ConstantSchedule(ExplorationSchedule):
+    """A schedule with the same exploration probability for every game.
+
+    Instance Attributes:
+        - exploration_probability: the exploration probability of every game
+    """
+    exploration_probability: float
+
+    def __init__(self, exploration_probability: float, games: int) -> None:
+        """Initialize a schedule of games with the given exploration probability.
+
+        Preconditions:
+            - 0.0 <= exploration_probability <= 1.0
+            - games >= 0
+        """
+        super().__init__(games)
+        self.exploration_probability = exploration_probability
+
+    def probability(self, game: int) -> float:
+        """Return the exploration probability of the given game."""
+        return self.exploration_probability
+
+    def parameters(self) -> dict:
+        """Return the kind and the parameters of this schedule."""
+        return {'schedule': 'constant', 'games': self.games,
+                'exploration_probability': self.exploration_probability}
+
+
+class LinearDecaySchedule(ExplorationSchedule):
+    """A schedule whose exploration probability changes linearly from start in the first
+    game to end in the last game.
+
+    Instance Attributes:
+        - start: the exploration probability of the first game
+        - end: the exploration probability of the last game
+    """
+    start: float
+    end: float
+
+    def __init__(self, start: float, end: float, games: int) -> None:
+        """Initialize a schedule decaying linearly from start to end over the given games.
+
+        Preconditions:
+            - 0.0 <= start <= 1.0
+            - 0.0 <= end <= 1.0
+            - games >= 0
+        """
+        super().__init__(games)
+        self.start = start
+        self.end = end
+
+    def probability(self, game: int) -> float:
+        """Return the exploration probability of the given game."""
+        if self.games == 1:
+            return self.start
+        return self.start + (self.end - self.start) * game / (self.games - 1)
+
+    def parameters(self) -> dict:
+        """Return the kind and the parameters of this schedule."""
+        return {'schedule': 'linear', 'games': self.games, 'start': self.start,
+                'end': self.end}
+
+
+class ExponentialDecaySchedule(ExplorationSchedule):
+    """A schedule whose exploration probability starts at start and is multiplied by rate
+    after every game, but never falls below minimum.
+
+    Instance Attributes:
+        - start: the exploration probability of the first game
+        - rate: the factor the exploration probability is multiplied by after each game
+        - minimum: the smallest exploration probability of any game
+    """
+    start: float
+    rate: float
+    minimum: float
+
+    def __init__(self, start: float, rate: float, games: int, minimum: float = 0.0) -> None:
+        """Initialize a schedule decaying exponentially from start by rate per game.
+
+        Preconditions:
+            - 0.0 <= minimum <= start <= 1.0
+            - 0.0 < rate <= 1.0
+            - games >= 0
+        """
+        super().__init__(games)
+        self.start = start
+        self.rate = rate
+        self.minimum = minimum
+
+    @classmethod
+    def with_half_life(cls, start: float, half_life: float, games: int,
+                       minimum: float = 0.0) -> ExponentialDecaySchedule:
+        """Return a schedule whose exploration probability halves every half_life games.
+
+        Preconditions:
+            - half_life > 0
+        """
+        return cls(start, 0.5 ** (1 / half_life), games, minimum)
+
+    def probability(self, game: int) -> float:
+        """Return the exploration probability of the given game."""
+        return max(self.minimum, self.start * self.rate ** game)
+
+    def parameters(self) -> dict:
+        """Return the kind and the parameters of this schedule."""
+        return {'schedule': 'exponential', 'games': self.games, 'start': self.start,
+                'rate': self.rate, 'minimum': self.minimum}
+
+
+class StepSchedule(ExplorationSchedule):
+    """A schedule made of consecutive blocks of games, each with a constant exploration
+    probability.
+
+    Instance Attributes:
+        - steps: the number of games and the exploration probability of each block, in order
+    """
+    steps: list[tuple[int, float]]
+    # Private Instance Attributes:
+    #   - _ends: the number of games before the end of each block
+    _ends: list[int]
+
+    def __init__(self, steps: list[tuple[int, float]]) -> None:
+        """Initialize a schedule from the given blocks of (games, exploration probability).
+
+        Preconditions:
+            - all(games >= 0 and 0.0 <= probability <= 1.0 for games, probability in steps)
+        """
+        super().__init__(sum(games for games, _ in steps))
+        self.steps = steps
+        self._ends = []
+        end = 0
+        for games, _ in steps:
+            end += games
+            self._ends.append(end)
+
+    def probability(self, game: int) -> float:
+        """Return the exploration probability of the given game."""
+        for end, (_, exploration_probability) in zip(self._ends, self.steps):
+            if game < end:
+                return exploration_probability
+        raise IndexError('Game ' + str(game) + ' is outside the schedule')
+
+    def parameters(self) -> dict:
+        """Return the kind and the parameters of this schedule."""
+        return {'schedule': 'step', 'steps': [list(step) for step in self.steps]}
+
+
+class EarlyStopping:
+    """A criterion ending a training run once the root of its game tree has converged.
+
+    The tree has converged when, for window consecutive games, the root's optimal move has
+    not changed and its win probability has stayed within tolerance of its value at the
+    start of the window. It is checked by runner.run_learning_algorithm after every game (or
+    batch of games), and training never stops before min_games games.
+
+    Instance Attributes:
+        - window: the number of games the root must stay stable for
+        - tolerance: the largest change in the root's win probability considered stable
+        - min_games: the number of games played before training can stop
+        - stopped_at: the number of games played when training stopped, or None if it has
+          not stopped
+
+    Representation Invariants:
+        - self.window >= 1
+        - self.tolerance >= 0.0
+        - self.min_games >= 0
+    """
+    window: int
+    tolerance: float
+    min_games: int
+    stopped_at: Optional[int]
+    # Private Instance Attributes:
+    #   - _optimal_move: the root's optimal move at the start of the current window
+    #   - _win_probability: the root's win probability at the start of the current window
+    #   - _window_start: the number of games played at the start of the current window
+    _optimal_move: Optional[int]
+    _win_probability: float
+    _window_start: int
+
+    def __init__(self, window: int = 1000, tolerance: float = 0.01, min_games: int = 0) -> None:
+        """Initialize an early stopping criterion with the given parameters.
+
+        Preconditions:
+            - window >= 1
+            - tolerance >= 0.0
+            - min_games >= 0
+        """
+        self.window = window
+        self.tolerance = tolerance
+        self.min_games = min_games
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget every game seen, to start a new training run."""
+        self.stopped_at = None
+        self._optimal_move = None
+        self._win_probability = math.nan
+        self._window_start = 0
+
+    def parameters(self) -> dict[str, Union[int, float]]:
+        """Return the parameters of this criterion, e.g. to identify trained trees."""
+        return {'window': self.window, 'tolerance': self.tolerance,
+                'min_games': self.min_games}
+
+    def update(self, games: int, game_tree: Union[gametree.GameTree,
+                                                  gametree.CompactGameTree]) -> bool:
+        """Record the root of game_tree after the given number of games, and return whether
+        training should stop.
+
+        This takes constant time for a GameTree, so it can be called after every game.
+        """
+        optimal_move = game_tree.get_optimal_move()
+        win_probability = game_tree.win_probability
+        if optimal_move != self._optimal_move \
+                or not abs(win_probability - self._win_probability) <= self.tolerance:
+            # The root changed, so start a new window
+            self._optimal_move = optimal_move
+            self._win_probability = win_probability
+            self._window_start = games
+            return False
+
+        if games >= self.min_games and games - self._window_start >= self.window:
+            self.stopped_at = games
+            return True
+        return False
+
+
+# if __name__ == "__main__":
+#     import python_ta.contracts
+#     python_ta.contracts.check_all_contracts()
+
+#     import python_ta
+#     python_ta.check_all(config={
+#         'extra-imports': ['math', 'gametree'],  # the names (strs) of imported modules
+#         'allowed-io': [],  # the names (strs) of functions that call print/open/input
+#         'max-line-length': 100,
+#         'disable': ['E1136']
+#     })
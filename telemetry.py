@@ -0,0 +1,224 @@
+"""CSC111 Winter 2021: Project Phase 2
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students and Faculty
+involved in CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited.
+
+This file is Copyright (c) 2021 Shayaan Khan, Markus Nimi, Matthew Chan and Aabid Anas.
+
+Telemetry for runner.run_learning_algorithm.
+
+A TrainingTelemetry writes one JSON object per line every interval games, for example:
+
+    {"games": 10000, "elapsed_seconds": 1.31, "games_per_second": 7633.6,
+     "run_game_seconds": 0.72, "insert_seconds": 0.48, "nodes": 70312, "depth": 21,
+     "rss_bytes": 81321984, "done": false}
+
+It can also profile the training with cProfile and trace its memory with tracemalloc.
+"""
+from __future__ import annotations
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Optional, TextIO, Union
+
+import gametree
+
+# The number of allocation sites reported in the final record when tracing memory
+TRACEMALLOC_TOP_SITES = 10
+
+
+def get_resident_memory() -> Optional[int]:
+    """Return the resident memory of this process in bytes, or None if it is not available.
+
+    On Linux this is the current resident memory. On other Unix systems it is the peak
+    resident memory, which is all the resource module provides.
+    """
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def measure_tree(tree: Union[gametree.GameTree, gametree.CompactGameTree]) -> tuple[int, int]:
+    """Return the number of distinct nodes in the given tree and its depth, where a tree with
+    only a root has depth 1.
+
+    This visits every node, so it takes time proportional to the size of the tree.
+    """
+    visited = {tree}
+    stack = [(tree, 1)]
+    depth = 1
+    while stack:
+        node, node_depth = stack.pop()
+        depth = max(depth, node_depth)
+        for subtree in node.get_subtrees():
+            if subtree not in visited:
+                visited.add(subtree)
+                stack.append((subtree, node_depth + 1))
+    return len(visited), depth
+
+
+class TrainingTelemetry:
+    """Instrumentation for one run of runner.run_learning_algorithm, which writes a JSON
+    record of the progress of the training every interval games and when it ends.
+
+    Each record contains the number of games played, the elapsed time, the games per second,
+    the total time spent playing games (in run_game or run_random_games) and inserting them
+    into the tree, the number of nodes and the depth of the tree, and the resident memory.
+    When trace_memory is True, it also contains the current and peak memory traced by
+    tracemalloc, and the final record contains the largest allocation sites.
+
+    If profile_path is given, the training is profiled with cProfile and the statistics are
+    saved to profile_path when it ends, to be read with the pstats module.
+
+    Instance Attributes:
+        - interval: the number of games between records
+        - profile_path: the file the cProfile statistics are saved to, or None
+        - trace_memory: whether memory allocations are traced with tracemalloc
+        - records: every record written so far
+
+    Representation Invariants:
+        - self.interval >= 1
+    """
+    interval: int
+    profile_path: Optional[str]
+    trace_memory: bool
+    records: list[dict]
+    # Private Instance Attributes:
+    #   - _output: the file the records are written to
+    #   - _owns_output: whether _output was opened by this object, and must be closed by it
+    #   - _games: the number of games played so far
+    #   - _run_game_seconds: the total time spent playing games so far
+    #   - _insert_seconds: the total time spent inserting games into the tree so far
+    #   - _start_time: the value of time.perf_counter() when the training started
+    #   - _profiler: the profiler of the training, or None
+    _output: TextIO
+    _owns_output: bool
+    _games: int
+    _run_game_seconds: float
+    _insert_seconds: float
+    _start_time: float
+    _profiler: Optional[cProfile.Profile]
+
+    def __init__(self, output: Union[str, TextIO], interval: int = 1000,
+                 profile_path: Optional[str] = None, trace_memory: bool = False) -> None:
+        """Initialize telemetry writing to output, which is either a path of a file to append
+        to or an open text file.
+
+        Preconditions:
+            - interval >= 1
+        """
+        if isinstance(output, str):
+            self._output = open(output, 'a')
+            self._owns_output = True
+        else:
+            self._output = output
+            self._owns_output = False
+        self.interval = interval
+        self.profile_path = profile_path
+        self.trace_memory = trace_memory
+        self.records = []
+        self._games = 0
+        self._run_game_seconds = 0.0
+        self._insert_seconds = 0.0
+        self._start_time = 0.0
+        self._profiler = None
+
+    def start(self) -> None:
+        """Start timing the training, and start the profiler and memory tracing if they were
+        requested.
+        """
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.profile_path is not None:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._start_time = time.perf_counter()
+
+    def add_game(self, run_game_seconds: float, insert_seconds: float,
+                 game_tree: Union[gametree.GameTree, gametree.CompactGameTree]) -> None:
+        """Record a game that took run_game_seconds to play and insert_seconds to insert into
+        game_tree, and write a record if it is the last game of an interval.
+        """
+        self._games += 1
+        self._run_game_seconds += run_game_seconds
+        self._insert_seconds += insert_seconds
+        if self._games % self.interval == 0:
+            self._write_record(game_tree, done=False)
+
+    def finish(self, game_tree: Union[gametree.GameTree, gametree.CompactGameTree]) -> None:
+        """Write the final record, stop the profiler and memory tracing, and save the profile.
+        """
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.profile_path)
+            self._profiler = None
+
+        self._write_record(game_tree, done=True)
+        if self.trace_memory:
+            tracemalloc.stop()
+        if self._owns_output:
+            self._output.close()
+
+    def _write_record(self, game_tree: Union[gametree.GameTree, gametree.CompactGameTree],
+                      done: bool) -> None:
+        """Write a record of the training so far."""
+        measure_start = time.perf_counter()
+        elapsed = measure_start - self._start_time
+        nodes, depth = measure_tree(game_tree)
+        # Leave the time spent measuring the tree out of the elapsed time of later records
+        self._start_time += time.perf_counter() - measure_start
+        record = {'games': self._games,
+                  'elapsed_seconds': elapsed,
+                  'games_per_second': self._games / elapsed if elapsed > 0 else 0.0,
+                  'run_game_seconds': self._run_game_seconds,
+                  'insert_seconds': self._insert_seconds,
+                  'nodes': nodes,
+                  'depth': depth,
+                  'rss_bytes': get_resident_memory(),
+                  'done': done}
+
+        if self.trace_memory:
+            record['traced_bytes'], record['peak_traced_bytes'] = tracemalloc.get_traced_memory()
+            if done:
+                statistics = tracemalloc.take_snapshot().statistics('lineno')
+                record['top_allocations'] = [
+                    {'site': str(statistic.traceback), 'bytes': statistic.size}
+                    for statistic in statistics[:TRACEMALLOC_TOP_SITES]]
+
+        self.records.append(record)
+        self._output.write(json.dumps(record) + '\n')
+        self._output.flush()
+
+
+# if __name__ == "__main__":
+#     import python_ta.contracts
+#     python_ta.contracts.check_all_contracts()
+
+#     import python_ta
+#     python_ta.check_all(config={
+#         'extra-imports': ['cProfile', 'json', 'os', 'sys', 'time', 'tracemalloc', 'resource',
+#                           'gametree'],
+#         # the names (strs) of imported modules
+#         'allowed-io': ['get_resident_memory', 'TrainingTelemetry.__init__'],
+#         # the names (strs) of functions that call print/open/input
+#         'max-line-length': 100,
+#         'disable': ['E1136']
+#     })
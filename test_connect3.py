@@ -0,0 +1,134 @@
+"""CSC111 Winter 2021: Project Phase 2
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students and Faculty
+involved in CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited.
+
+This file is Copyright (c) 2021 Shayaan Khan, Markus Nimi, Matthew Chan and Aabid Anas.
+
+Tests for connect3.py.
+"""
+import time
+from concurrent.futures import wait
+from typing import Optional
+
+import numpy as np
+from hypothesis import given, strategies as st
+
+import connect3
+
+
+def _play(moves: list[int]) -> connect3.Connect3Game:
+    """Return a new game after the given moves."""
+    game = connect3.Connect3Game()
+    for move in moves:
+        game.make_move(move)
+    return game
+
+
+@given(st.lists(st.integers(min_value=0, max_value=connect3.COLUMN_COUNT - 1),
+                max_size=connect3.CELL_COUNT))
+def test_bitboard_engine_matches_connect3_game(choices: list[int]) -> None:
+    """Test that Connect3Game and BitboardConnect3Game agree after every move of a game.
+
+    Each choice picks one of the valid moves, so every list of choices is a legal game,
+    which stops early if it is won.
+    """
+    numpy_game = connect3.Connect3Game()
+    bitboard_game = connect3.BitboardConnect3Game()
+    for choice in choices:
+        if bitboard_game.get_winner() is not None:
+            break
+        valid_moves = bitboard_game.get_valid_moves()
+        move = valid_moves[choice % len(valid_moves)]
+        numpy_game.make_move(move)
+        bitboard_game.make_move(move)
+
+        assert np.array_equal(numpy_game.get_board(), bitboard_game.get_board())
+        assert numpy_game.get_valid_moves() == bitboard_game.get_valid_moves()
+        assert numpy_game.is_yellow_move() == bitboard_game.is_yellow_move()
+        assert numpy_game.get_winner() == bitboard_game.get_winner()
+        assert numpy_game.get_position_key() == bitboard_game.get_position_key()
+
+
+def test_solve_won_position_matches_winning_move() -> None:
+    """Test that a position the previous player has already won scores the negative of the
+    score of the position before their winning move.
+    """
+    solver = connect3.Connect3Solver()
+    before_win = solver.solve(_play([0, 1, 0, 1]))
+    after_win = solver.solve(_play([0, 1, 0, 1, 0]))
+    assert before_win == connect3.CELL_COUNT + 1 - 5
+    assert after_win == -before_win
+
+
+def test_mcts_player_moves_without_budget() -> None:
+    """Test that an MCTSPlayer still makes a valid move when its budget allows no playouts.
+    """
+    game = connect3.Connect3Game()
+    for player in (connect3.MCTSPlayer(time_limit=0.0), connect3.MCTSPlayer(playouts=0)):
+        assert player.make_move(game, None) in game.get_valid_moves()
+
+
+class _SlowPlayer(connect3.Player):
+    """A player that takes delay seconds to play the left-most valid move.
+
+    Instance Attributes:
+        - delay: the number of seconds each move takes
+        - searched: the position key of every game a move was made in, shared by copies
+    """
+    delay: float
+    searched: list[int]
+
+    def __init__(self, delay: float) -> None:
+        """Initialize a player whose moves take delay seconds."""
+        self.delay = delay
+        self.searched = []
+
+    def make_move(self, game: connect3.Connect3Game, previous_move: Optional[int]) -> int:
+        """Wait for self.delay seconds, then play the left-most valid move."""
+        time.sleep(self.delay)
+        self.searched.append(game.get_position_key())
+        return game.get_valid_moves()[0]
+
+
+def test_pondering_player_uses_finished_reply() -> None:
+    """Test that a PonderingPlayer returns a reply it finished pondering without searching.
+    """
+    slow_player = _SlowPlayer(0.05)
+    player = connect3.PonderingPlayer(slow_player)
+    game = connect3.Connect3Game()
+    player.ponder(game)
+    wait([future for future, _ in player._replies.values()])
+    assert len(slow_player.searched) == connect3.COLUMN_COUNT
+
+    game.make_move(2)
+    start = time.perf_counter()
+    assert player.make_move(game, 2) == 0
+    assert time.perf_counter() - start < slow_player.delay
+    assert len(slow_player.searched) == connect3.COLUMN_COUNT
+    player.close()
+
+
+def test_pondering_player_does_not_wait_for_other_replies() -> None:
+    """Test that when the reply to the opponent's move has not been pondered yet, a
+    PonderingPlayer cancels the other replies instead of waiting for them, and waits for at
+    most the reply already being computed.
+    """
+    slow_player = _SlowPlayer(0.2)
+    player = connect3.PonderingPlayer(slow_player)
+    game = connect3.Connect3Game()
+    player.ponder(game)
+
+    # The reply to the last column is queued behind the replies to every other column
+    game.make_move(connect3.COLUMN_COUNT - 1)
+    start = time.perf_counter()
+    assert player.make_move(game, connect3.COLUMN_COUNT - 1) == 0
+    assert time.perf_counter() - start < 3 * slow_player.delay
+    assert len(slow_player.searched) == 2
+    assert slow_player.searched[-1] == game.get_position_key()
+    player.close()
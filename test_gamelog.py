@@ -0,0 +1,83 @@
+"""CSC111 Winter 2021: Project Phase 2
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students and Faculty
+involved in CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited.
+
+This file is Copyright (c) 2021 Shayaan Khan, Markus Nimi, Matthew Chan and Aabid Anas.
+
+Tests for gamelog.py.
+"""
+import os
+import tempfile
+
+import numpy as np
+import pytest
+from hypothesis import given, strategies as st
+
+import connect3
+import gamelog
+import gametree
+
+games_strategy = st.lists(st.tuples(st.sampled_from(connect3.WINNERS),
+                                    st.lists(st.integers(min_value=0, max_value=15),
+                                             max_size=gamelog.MAX_MOVES)))
+
+
+@given(games_strategy, games_strategy)
+def test_round_trip(first_games: list[tuple[str, list[int]]],
+                    second_games: list[tuple[str, list[int]]]) -> None:
+    """Test that games written by two writers appending to the same log, with small read
+    chunks so that records span chunks, are read back in order.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'games.c3gl')
+        for games in (first_games, second_games):
+            with gamelog.GameLogWriter(path) as log:
+                for winner, moves in games:
+                    log.write_game(winner, moves)
+
+        chunk_bytes = gamelog.READ_CHUNK_BYTES
+        gamelog.READ_CHUNK_BYTES = 7
+        try:
+            assert list(gamelog.read_games(path)) == first_games + second_games
+        finally:
+            gamelog.READ_CHUNK_BYTES = chunk_bytes
+
+
+def test_replay_matches_training(tmp_path) -> None:
+    """Test that replaying a log gives the same tree as inserting the games directly."""
+    winners, move_sequences = connect3.run_random_games(2000, np.random.default_rng(19))
+    path = str(tmp_path / 'games.c3gl')
+    tree = gametree.GameTree('Yellow')
+    with gamelog.GameLogWriter(path) as log:
+        for winner, moves in zip(winners, move_sequences):
+            log.write_game(winner, moves)
+            tree.insert_move_sequence(moves, connect3.score_game(winner, 'Yellow'))
+
+    replayed_tree = gamelog.replay_game_log(path, 'Yellow')
+    assert replayed_tree.visits == tree.visits == 2000
+    assert replayed_tree.get_optimal_move() == tree.get_optimal_move()
+    assert str(replayed_tree).count('\n') == str(tree).count('\n')
+
+
+def test_rejects_bad_logs(tmp_path) -> None:
+    """Test that files which are not game logs, and truncated logs, raise ValueError."""
+    other_path = tmp_path / 'other.c3gl'
+    other_path.write_bytes(b'not a game log')
+    with pytest.raises(ValueError):
+        list(gamelog.read_games(str(other_path)))
+    with pytest.raises(ValueError):
+        gamelog.GameLogWriter(str(other_path))
+
+    path = str(tmp_path / 'games.c3gl')
+    with gamelog.GameLogWriter(path) as log:
+        log.write_game('Red', [0, 1, 2, 3, 4])
+    with open(path, 'r+b') as file:
+        file.truncate(os.path.getsize(path) - 1)
+    with pytest.raises(ValueError):
+        list(gamelog.read_games(path))
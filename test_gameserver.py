@@ -0,0 +1,120 @@
+"""CSC111 Winter 2021: Project Phase 2
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students and Faculty
+involved in CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited.
+
+This file is Copyright (c) 2021 Shayaan Khan, Markus Nimi, Matthew Chan and Aabid Anas.
+
+Tests for gameserver.py.
+"""
+import asyncio
+import json
+
+import numpy as np
+
+import connect3
+import gameserver
+import gametree
+
+
+def _game_trees() -> dict[str, gametree.GameTree]:
+    """Return a small trained game tree for a human playing as each colour."""
+    winners, move_sequences = connect3.run_random_games(500, np.random.default_rng(18))
+    game_trees = {}
+    for human in ('Yellow', 'Red'):
+        game_trees[human] = gametree.GameTree(human)
+        for winner, moves in zip(winners, move_sequences):
+            game_trees[human].insert_move_sequence(moves, connect3.score_game(winner, human))
+    return game_trees
+
+
+async def _send(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                line: bytes) -> dict:
+    """Send one line to the server and return its response."""
+    writer.write(line + b'\n')
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+def _run_client(client) -> None:
+    """Start a game server on a free local port and run the coroutine function client with a
+    reader and writer connected to it.
+    """
+    async def run() -> None:
+        server = await asyncio.start_server(
+            gameserver.GameServer(_game_trees()).handle_client, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            try:
+                await client(reader, writer)
+            finally:
+                writer.close()
+                await writer.wait_closed()
+
+    asyncio.run(run())
+
+
+def test_malformed_commands_get_error_replies() -> None:
+    """Test that malformed commands, including ones whose fields have the wrong types, are
+    answered with an error, and that the connection can still be used afterwards.
+    """
+    malformed_before_game = [b'not json',
+                             b'[1, 2]',
+                             b'{"command": "dance"}',
+                             b'{"command": "move", "column": 0}',
+                             b'{"command": "new_game", "human": ["Red"]}',
+                             b'{"command": "new_game", "human": {"colour": "Red"}}',
+                             b'{"command": "new_game", "human": "Blue"}']
+    malformed_moves = [b'{"command": "move", "column": true}',
+                       b'{"command": "move", "column": false}',
+                       b'{"command": "move", "column": "0"}',
+                       b'{"command": "move", "column": 1.0}',
+                       b'{"command": "move", "column": [0]}',
+                       b'{"command": "move", "column": 9}',
+                       b'{"command": "move"}']
+
+    async def client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        for line in malformed_before_game:
+            assert set(await _send(reader, writer, line)) == {'error'}
+        state = await _send(reader, writer, b'{"command": "new_game", "human": "Yellow"}')
+        assert state == {'ai_move': None, 'winner': None, 'valid_moves': [0, 1, 2, 3, 4]}
+        for line in malformed_moves:
+            assert set(await _send(reader, writer, line)) == {'error'}
+        state = await _send(reader, writer, b'{"command": "move", "column": 0}')
+        assert state['winner'] is None and state['ai_move'] in range(connect3.COLUMN_COUNT)
+
+    _run_client(client)
+
+
+def test_game_round_trip() -> None:
+    """Test that a client can play whole games as each colour, and that the server's
+    responses match the game the client keeps.
+    """
+    async def client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        for human in ('Yellow', 'Red'):
+            game = connect3.Connect3Game()
+            state = await _send(reader, writer,
+                                json.dumps({'command': 'new_game', 'human': human}).encode())
+            while True:
+                if state['ai_move'] is not None:
+                    game.make_move(state['ai_move'])
+                assert state['winner'] == game.get_winner()
+                assert state['valid_moves'] == list(game.get_valid_moves())
+                if state['winner'] is not None:
+                    break
+                assert game.is_yellow_move() == (human == 'Yellow')
+                column = game.get_valid_moves()[0]
+                game.make_move(column)
+                state = await _send(reader, writer,
+                                    json.dumps({'command': 'move', 'column': column}).encode())
+        writer.write(b'{"command": "quit"}\n')
+        await writer.drain()
+        assert await reader.readline() == b''
+
+    _run_client(client)
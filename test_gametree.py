@@ -0,0 +1,163 @@
+"""CSC111 Winter 2021: Project Phase 2
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students and Faculty
+involved in CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited.
+
+This file is Copyright (c) 2021 Shayaan Khan, Markus Nimi, Matthew Chan and Aabid Anas.
+
+Tests for gametree.py.
+"""
+import numpy as np
+import pytest
+
+import connect3
+import gametree
+
+
+def _random_games(count: int, seed: int, player_selection: str = 'Red') \
+        -> list[tuple[list[int], float]]:
+    """Return count random games as (moves, win_probability) pairs scored for
+    player_selection.
+    """
+    winners, move_sequences = connect3.run_random_games(count, np.random.default_rng(seed))
+    return [(moves, connect3.score_game(winner, player_selection))
+            for winner, moves in zip(winners, move_sequences)]
+
+
+def _expected_win_probability(node: gametree.GameTree) -> float:
+    """Return the win probability of node recalculated from its subtrees.
+
+    Preconditions:
+        - node.get_subtrees() != []
+    """
+    subtrees = node.get_subtrees()
+    if node._is_computer_move():
+        return max(subtree.win_probability for subtree in subtrees)
+    return sum(subtree.win_probability for subtree in subtrees) / len(subtrees)
+
+
+def test_transpositions_update_every_parent() -> None:
+    """Test that every node of a transposition-aware tree has the win probability and the
+    optimal subtree of its subtrees, including nodes whose shared subtrees were last updated
+    through another parent.
+    """
+    tree = gametree.GameTree('Red', transpositions=True)
+    for moves, win_probability in _random_games(5000, 1):
+        tree.insert_move_sequence(moves, win_probability)
+
+    nodes = set(tree._transpositions.values())
+    for node in nodes:
+        if node.get_subtrees() != []:
+            assert node.win_probability == _expected_win_probability(node)
+            assert node.get_optimal_subtree() is node._find_best_subtree()
+
+
+def _all_nodes(tree: gametree.GameTree) -> list[gametree.GameTree]:
+    """Return every node of tree, which is not transposition-aware."""
+    nodes = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        stack.extend(node.get_subtrees())
+    return nodes
+
+
+def _move_paths(tree: gametree.GameTree, max_depth: int) -> set[tuple[int, ...]]:
+    """Return the move sequences from the root of tree to every node at most max_depth deep.
+    """
+    paths = set()
+    stack = [((), tree)]
+    while stack:
+        path, node = stack.pop()
+        paths.add(path)
+        if len(path) < max_depth:
+            stack.extend((path + (subtree.move,), subtree) for subtree in node.get_subtrees())
+    return paths
+
+
+def test_node_budget_invariants() -> None:
+    """Test that a tree with a node budget stays within its budget, counts its nodes
+    correctly, never evicts nodes shallower than EVICTION_MIN_DEPTH and keeps every win
+    probability consistent with the remaining subtrees.
+    """
+    budget = 3000
+    tree = gametree.GameTree('Red', node_budget=budget)
+    unbounded_tree = gametree.GameTree('Red')
+    for i, (moves, win_probability) in enumerate(_random_games(5000, 2)):
+        tree.insert_move_sequence(moves, win_probability)
+        unbounded_tree.insert_move_sequence(moves, win_probability)
+        if i % 500 == 0:
+            assert len(_all_nodes(tree)) == tree._node_count <= budget
+
+    nodes = _all_nodes(tree)
+    assert len(nodes) == tree._node_count <= budget
+    assert len(_all_nodes(unbounded_tree)) > budget
+    shallow_depth = gametree.EVICTION_MIN_DEPTH - 1
+    assert _move_paths(tree, shallow_depth) == _move_paths(unbounded_tree, shallow_depth)
+    for node in nodes:
+        if node.get_subtrees() != []:
+            assert node.win_probability == _expected_win_probability(node)
+            assert node.get_optimal_subtree() is node._find_best_subtree()
+
+
+def _assert_same_tree(tree: gametree.GameTree, other: gametree.GameTree) -> None:
+    """Assert that the two trees, which are not transposition-aware, have the same moves in
+    the same order, and exactly the same visits, win probabilities and optimal moves.
+    """
+    stack = [(tree, other)]
+    while stack:
+        node, other_node = stack.pop()
+        assert node.move == other_node.move
+        assert node.is_yellow_move == other_node.is_yellow_move
+        assert node.win_probability == other_node.win_probability
+        assert node.get_optimal_move() == other_node.get_optimal_move()
+        if isinstance(node, gametree.GameTree):
+            assert node.visits == other_node.visits
+        subtrees = node.get_subtrees()
+        other_subtrees = other_node.get_subtrees()
+        assert len(subtrees) == len(other_subtrees)
+        stack.extend(zip(subtrees, other_subtrees))
+
+
+@pytest.mark.parametrize('make_tree', [
+    lambda: gametree.GameTree('Red'),
+    lambda: gametree.GameTree('Red', symmetric=True),
+    lambda: gametree.GameTree('Red', node_budget=2000),
+    lambda: gametree.CompactGameTree('Red'),
+    lambda: gametree.CompactGameTree('Red', symmetric=True)
+])
+def test_insert_many_matches_insert_move_sequence(make_tree) -> None:
+    """Test that inserting games with insert_many, in several calls, gives the same tree as
+    inserting them one at a time.
+    """
+    games = _random_games(3000, 24)
+    tree = make_tree()
+    for moves, win_probability in games:
+        tree.insert_move_sequence(moves, win_probability)
+
+    bulk_tree = make_tree()
+    bulk_tree.insert_many(games[:1000])
+    bulk_tree.insert_many(iter(games[1000:]))
+    _assert_same_tree(tree, bulk_tree)
+
+
+def test_insert_many_with_transpositions() -> None:
+    """Test that insert_many into a transposition-aware tree gives the same tree as
+    inserting the games one at a time.
+    """
+    games = _random_games(2000, 24)
+    tree = gametree.GameTree('Red', transpositions=True)
+    for moves, win_probability in games:
+        tree.insert_move_sequence(moves, win_probability)
+    bulk_tree = gametree.GameTree('Red', transpositions=True)
+    bulk_tree.insert_many(games)
+    assert str(bulk_tree) == str(tree)
+    for position_key, node in tree._transpositions.items():
+        bulk_node = bulk_tree.get_subtree_by_position(position_key)
+        assert bulk_node.get_optimal_move() == node.get_optimal_move()
@@ -0,0 +1,58 @@
+"""CSC111 Winter 2021: Project Phase 2
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students and Faculty
+involved in CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited.
+
+This file is Copyright (c) 2021 Shayaan Khan, Markus Nimi, Matthew Chan and Aabid Anas.
+
+Tests for runner.py.
+"""
+import connect3
+import runner
+import schedules
+
+
+def test_early_stopping_with_few_games(capsys) -> None:
+    """Test that training which stops after too few games for a last 20% still reports its
+    results.
+    """
+    early_stopping = schedules.EarlyStopping(window=1)
+    runner.run_learning_algorithm(schedules.ConstantSchedule(1.0, 1000), 'Red',
+                                  show_stats=False, seed=2, early_stopping=early_stopping)
+    assert early_stopping.stopped_at == 2
+    assert '---Cumulative:---' in capsys.readouterr().out
+
+
+def test_empty_schedule() -> None:
+    """Test that training on an empty schedule returns a tree with only a root."""
+    game_tree = runner.run_learning_algorithm(schedules.ConstantSchedule(1.0, 0), 'Red',
+                                              show_stats=False)
+    assert game_tree.get_subtrees() == []
+
+
+def test_processes_share_the_options() -> None:
+    """Test that the games split between worker processes are played with the options given
+    to run_learning_algorithm, and that seeded runs are reproducible.
+    """
+    probabilities = schedules.ConstantSchedule(1.0, 2000)
+    trees = [runner.run_learning_algorithm(probabilities, 'Red', show_stats=False,
+                                           processes=2, seed=5, symmetric=True)
+             for _ in range(2)]
+    assert trees[0].visits == 2000
+    assert trees[0].is_symmetric()
+    assert str(trees[0]) == str(trees[1])
+
+
+def test_train_and_play_early_stopping(monkeypatch) -> None:
+    """Test that runner_train_and_play passes early_stopping on to the training."""
+    monkeypatch.setattr(connect3.GameStatistics, 'plot', lambda statistics: None)
+    early_stopping = schedules.EarlyStopping(window=1)
+    game_tree = runner.runner_train_and_play(1000, 'Red', seed=2,
+                                             early_stopping=early_stopping)
+    assert early_stopping.stopped_at == 2
+    assert game_tree.visits == 2
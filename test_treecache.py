@@ -0,0 +1,67 @@
+"""CSC111 Winter 2021: Project Phase 2
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students and Faculty
+involved in CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited.
+
+This file is Copyright (c) 2021 Shayaan Khan, Markus Nimi, Matthew Chan and Aabid Anas.
+
+Tests for treecache.py.
+"""
+import os
+
+import numpy as np
+
+import connect3
+import gametree
+import schedules
+import treecache
+
+
+def test_schedule_cache_keys() -> None:
+    """Test that schedules are keyed by their parameters, without computing every
+    probability, so that even a schedule of a billion games is keyed immediately.
+    """
+    games = 10 ** 9
+    key = treecache.make_cache_key(games, 'Red', schedules.ConstantSchedule(1.0, games), 1)
+    assert key == treecache.make_cache_key(games, 'Red',
+                                           schedules.ConstantSchedule(1.0, games), 1)
+    assert key != treecache.make_cache_key(games, 'Red',
+                                           schedules.ConstantSchedule(0.5, games), 1)
+    assert key != treecache.make_cache_key(
+        games, 'Red', schedules.StepSchedule([(games, 1.0)]), 1)
+    assert key != treecache.make_cache_key(games, 'Red',
+                                           schedules.ConstantSchedule(1.0, games), 1,
+                                           schedules.EarlyStopping().parameters())
+
+
+def test_least_recently_used_tree_is_evicted(tmp_path) -> None:
+    """Test that a cache over its size limit evicts the least recently used tree, where
+    getting a tree counts as using it, and that hits and misses are counted.
+    """
+    winners, move_sequences = connect3.run_random_games(200, np.random.default_rng(12))
+    tree = gametree.GameTree('Red')
+    for winner, moves in zip(winners, move_sequences):
+        tree.insert_move_sequence(moves, connect3.score_game(winner, 'Red'))
+
+    cache = treecache.TreeCache(str(tmp_path / 'cache'))
+    cache.put('a', tree)
+    # Leave room for two trees, but not three
+    cache.max_bytes = int(2.5 * os.path.getsize(cache._path('a')))
+    cache.put('b', tree)
+    # Make 'a' older than 'b', so the order does not depend on the file system's precision
+    os.utime(cache._path('a'), (1000, 1000))
+    os.utime(cache._path('b'), (2000, 2000))
+
+    assert cache.get('a') is not None
+    assert cache.get('missing') is None
+    cache.put('c', tree)
+
+    assert sorted(os.listdir(cache.directory)) == ['a.c3gt', 'c.c3gt']
+    assert cache.get('b') is None
+    assert str(cache.get('a')) == str(cache.get('c')) == str(tree)
+    assert (cache.hits, cache.misses) == (3, 2)
@@ -0,0 +1,71 @@
+"""CSC111 Winter 2021: Project Phase 2
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students and Faculty
+involved in CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited.
+
+This file is Copyright (c) 2021 Shayaan Khan, Markus Nimi, Matthew Chan and Aabid Anas.
+
+Tests for treefile.py.
+"""
+import numpy as np
+import pytest
+
+import connect3
+import gametree
+import treefile
+
+
+def _trained_tree(games: int, symmetric: bool = False) -> gametree.GameTree:
+    """Return a Red GameTree trained on the given number of seeded random games."""
+    winners, move_sequences = connect3.run_random_games(games, np.random.default_rng(8))
+    tree = gametree.GameTree('Red', symmetric=symmetric)
+    for winner, moves in zip(winners, move_sequences):
+        tree.insert_move_sequence(moves, connect3.score_game(winner, 'Red'))
+    return tree
+
+
+@pytest.mark.parametrize('symmetric', [False, True])
+def test_round_trip(tmp_path, symmetric: bool) -> None:
+    """Test that a saved tree is read back with the same nodes, both as a GameTree and as a
+    memory-mapped CompactGameTree.
+    """
+    tree = _trained_tree(2000, symmetric)
+    path = str(tmp_path / 'tree.c3gt')
+    node_count = treefile.save_game_tree(tree, path)
+    assert node_count == str(tree).count('\n')
+
+    loaded_tree = treefile.load_game_tree(path)
+    compact_tree = treefile.open_compact_game_tree(path)
+    for other in (loaded_tree, compact_tree):
+        assert str(other) == str(tree)
+        assert other.player_selection == tree.player_selection
+        assert other.is_symmetric() == symmetric
+        assert other.get_optimal_move() == tree.get_optimal_move()
+
+
+def test_writable_tree_accepts_inserts(tmp_path) -> None:
+    """Test that a tree opened with writable=True learns new games like the original tree."""
+    tree = _trained_tree(500)
+    path = str(tmp_path / 'tree.c3gt')
+    treefile.save_game_tree(tree, path)
+    compact_tree = treefile.open_compact_game_tree(path, writable=True)
+
+    for moves, win_probability in [([0, 1, 0, 1, 0], 0.0), ([4, 4, 4, 4, 3, 3, 2], 1.0)]:
+        tree.insert_move_sequence(moves, win_probability)
+        compact_tree.insert_move_sequence(moves, win_probability)
+    assert str(compact_tree) == str(tree)
+
+
+def test_rejects_other_files(tmp_path) -> None:
+    """Test that files which are not tree files raise ValueError."""
+    path = tmp_path / 'not_a_tree.c3gt'
+    path.write_bytes(b'not a game tree file at all')
+    with pytest.raises(ValueError):
+        treefile.load_game_tree(str(path))
+    with pytest.raises(ValueError):
+        treefile.open_compact_game_tree(str(path))
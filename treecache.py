@@ -0,0 +1,128 @@
+"""CSC111 Winter 2021: Project Phase 2
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students and Faculty
+involved in CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited.
+
+This file is Copyright (c) 2021 Shayaan Khan, Markus Nimi, Matthew Chan and Aabid Anas."""
+from __future__ import annotations
+import hashlib
+import json
+import os
+from typing import Optional, Union
+
+import connect3
+import gametree
+import schedules
+import treefile
+
+CACHE_FILE_EXTENSION = '.c3gt'
+
+
+def make_cache_key(games: int, tree_player: str,
+                   exploration_probabilities: Union[list[float],
+                                                    schedules.ExplorationSchedule],
+                   seed: Optional[int], early_stopping: Optional[dict] = None) -> str:
+    """Return the cache key of a tree trained with the given parameters.
+
+    The key also depends on connect3.ENGINE_VERSION and the tree file format version, so
+    trees trained by older code are never returned. A seed of None means the training was
+    not seeded, so any tree trained with the other parameters is an equally good match.
+    A schedule is identified by its parameters, so its probabilities are never computed
+    here. early_stopping is the parameters of the schedules.EarlyStopping used, if any.
+    """
+    if isinstance(exploration_probabilities, schedules.ExplorationSchedule):
+        probabilities_key = exploration_probabilities.parameters()
+    else:
+        probabilities_key = [repr(p) for p in exploration_probabilities]
+    parameters = {'games': games,
+                  'tree_player': tree_player,
+                  'exploration_probabilities': probabilities_key,
+                  'seed': seed,
+                  'engine_version': connect3.ENGINE_VERSION,
+                  'format_version': treefile.FORMAT_VERSION}
+    if early_stopping is not None:
+        parameters['early_stopping'] = early_stopping
+    return hashlib.sha256(json.dumps(parameters, sort_keys=True).encode()).hexdigest()
+
+
+class TreeCache:
+    """A cache of trained game trees, stored as tree files in a directory.
+
+    The total size of the files is kept under max_bytes by deleting the least recently used
+    trees. A file's modification time is updated whenever it is used, so the cache keeps
+    working across runs.
+
+    Instance Attributes:
+        - directory: the directory containing the cached tree files
+        - max_bytes: the maximum total size of the cached tree files
+        - hits: the number of calls to get that found a tree
+        - misses: the number of calls to get that did not find a tree
+    """
+    directory: str
+    max_bytes: int
+    hits: int
+    misses: int
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024) -> None:
+        """Initialize a cache in the given directory, creating it if necessary."""
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        """Return the path of the file for the given key."""
+        return os.path.join(self.directory, key + CACHE_FILE_EXTENSION)
+
+    def get(self, key: str) -> Optional[gametree.CompactGameTree]:
+        """Return the tree cached under the given key as a read-only CompactGameTree, or None
+        if there is none.
+        """
+        path = self._path(key)
+        try:
+            tree = treefile.open_compact_game_tree(path)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return tree
+
+    def put(self, key: str, tree: Union[gametree.GameTree, gametree.CompactGameTree]) -> None:
+        """Save the given tree under the given key, then evict the least recently used trees
+        until the cache fits in max_bytes.
+        """
+        path = self._path(key)
+        # Write to a temporary file first so that a half-written tree is never read
+        treefile.save_game_tree(tree, path + '.tmp')
+        os.replace(path + '.tmp', path)
+        self._evict(keep=path)
+
+    def _evict(self, keep: str) -> None:
+        """Delete the least recently used trees, other than the one at the path keep, until
+        the cache fits in max_bytes.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(CACHE_FILE_EXTENSION):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(self.directory, name)))
+        entries.sort()
+
+        total_size = sum(entry[1] for entry in entries)
+        for _, size, path in entries:
+            if total_size <= self.max_bytes:
+                break
+            elif path != keep:
+                try:
+                    os.remove(path)
+                    total_size -= size
+                except OSError:
+                    # The file may be in use (e.g. memory-mapped on Windows)
+                    pass
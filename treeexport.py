@@ -0,0 +1,185 @@
+"""CSC111 Winter 2021: Project Phase 2
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students and Faculty
+involved in CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited.
+
+This file is Copyright (c) 2021 Shayaan Khan, Markus Nimi, Matthew Chan and Aabid Anas.
+
+Streaming exports and summaries of game trees.
+
+Every function here visits the nodes of a tree one at a time with iter_nodes, and writes
+each line of an export as soon as its node is visited, so trees of any size can be inspected
+in memory proportional to their depth. Each function takes an optional max_depth, where the
+root has depth 0, and nodes deeper than it are skipped.
+"""
+from __future__ import annotations
+import contextlib
+import json
+from typing import Iterator, Optional, TextIO, Union
+
+import numpy as np
+
+import gametree
+
+# The number of equal-width bins of win probabilities in summarize_tree
+WIN_PROBABILITY_BINS = 10
+
+AnyGameTree = Union[gametree.GameTree, gametree.CompactGameTree]
+
+
+def iter_nodes(tree: AnyGameTree, max_depth: Optional[int] = None) \
+        -> Iterator[tuple[int, int, int, AnyGameTree]]:
+    """Yield (index, parent index, depth, node) for every node of tree in preorder, the same
+    order as str(tree).
+
+    Nodes are numbered from 0 in the order they are yielded, and the root's parent index
+    is -1. In a transposition-aware tree, every shared node is only yielded the first time it
+    is reached.
+    """
+    seen = set() if tree.has_transpositions() else None
+    stack = [(gametree.NO_NODE, 0, tree)]
+    index = 0
+    while stack:
+        parent_index, depth, node = stack.pop()
+        if seen is not None:
+            if node in seen:
+                continue
+            seen.add(node)
+
+        yield index, parent_index, depth, node
+        if max_depth is None or depth < max_depth:
+            subtrees = node.get_subtrees()
+            # Push the subtrees in reverse so that the first one is visited first
+            for subtree in reversed(subtrees):
+                stack.append((index, depth + 1, subtree))
+        index += 1
+
+
+@contextlib.contextmanager
+def _open_output(output: Union[str, TextIO]) -> Iterator[TextIO]:
+    """Return a context manager for output, which is either a path of a file to create or an
+    open text file. Only files opened here are closed at the end.
+    """
+    if isinstance(output, str):
+        with open(output, 'w') as file:
+            yield file
+    else:
+        yield output
+
+
+def _describe_node(node: AnyGameTree) -> str:
+    """Return the description of node used in the text export, as in str(tree)."""
+    if node.is_yellow_move:
+        turn_desc = "Yellow's move"
+    else:
+        turn_desc = "Red's move"
+    return f'{node.move} -> {turn_desc} ({node.win_probability})'
+
+
+def export_text(tree: AnyGameTree, output: Union[str, TextIO],
+                max_depth: Optional[int] = None) -> int:
+    """Write tree to output in the indented format of str(tree), and return the number of
+    nodes written.
+    """
+    count = 0
+    with _open_output(output) as file:
+        for _, _, depth, node in iter_nodes(tree, max_depth):
+            file.write('  ' * depth + _describe_node(node) + '\n')
+            count += 1
+    return count
+
+
+def export_jsonl(tree: AnyGameTree, output: Union[str, TextIO],
+                 max_depth: Optional[int] = None) -> int:
+    """Write one JSON object per node of tree to output, and return the number of nodes
+    written.
+
+    Each object has the node's index and its parent's index (as in iter_nodes), its depth,
+    move, is_yellow_move and win_probability.
+    """
+    count = 0
+    with _open_output(output) as file:
+        for index, parent_index, depth, node in iter_nodes(tree, max_depth):
+            file.write(json.dumps({'index': index, 'parent': parent_index, 'depth': depth,
+                                   'move': node.move, 'is_yellow_move': node.is_yellow_move,
+                                   'win_probability': node.win_probability}) + '\n')
+            count += 1
+    return count
+
+
+def export_dot(tree: AnyGameTree, output: Union[str, TextIO],
+               max_depth: Optional[int] = None) -> int:
+    """Write tree to output as a Graphviz DOT graph, and return the number of nodes written.
+
+    Each node is labelled with its win probability, each edge with its move, and nodes where
+    yellow is to move are yellow, the others red.
+    """
+    count = 0
+    with _open_output(output) as file:
+        file.write('digraph GameTree {\n')
+        file.write('  node [style=filled];\n')
+        for index, parent_index, _, node in iter_nodes(tree, max_depth):
+            colour = 'yellow' if node.is_yellow_move else 'lightcoral'
+            file.write(f'  n{index} [label="{node.win_probability:.3f}", '
+                       f'fillcolor={colour}];\n')
+            if parent_index != gametree.NO_NODE:
+                file.write(f'  n{parent_index} -> n{index} [label="{node.move}"];\n')
+            count += 1
+        file.write('}\n')
+    return count
+
+
+def summarize_tree(tree: AnyGameTree, max_depth: Optional[int] = None) -> dict:
+    """Return a summary of tree with:
+        - 'nodes': the number of nodes
+        - 'nodes_per_depth': the number of nodes at each depth
+        - 'leaves': the number of nodes without subtrees
+        - 'branching_factor': the mean number of subtrees of the nodes with subtrees
+        - 'branching_factor_per_depth': the same, for the nodes at each depth
+        - 'win_probability_histogram': the number of nodes with a win probability in each
+          of WIN_PROBABILITY_BINS equal-width bins from 0 to 1
+        - 'mean_win_probability': the mean win probability of the nodes
+
+    Nodes at max_depth are counted as leaves.
+    """
+    nodes_per_depth = []
+    subtrees_per_depth = []
+    parents_per_depth = []
+    histogram = np.zeros(WIN_PROBABILITY_BINS, dtype=np.int64)
+    win_total = 0.0
+    leaves = 0
+    for _, _, depth, node in iter_nodes(tree, max_depth):
+        if depth == len(nodes_per_depth):
+            nodes_per_depth.append(0)
+            subtrees_per_depth.append(0)
+            parents_per_depth.append(0)
+        nodes_per_depth[depth] += 1
+
+        subtree_count = 0 if depth == max_depth else len(node.get_subtrees())
+        if subtree_count == 0:
+            leaves += 1
+        else:
+            subtrees_per_depth[depth] += subtree_count
+            parents_per_depth[depth] += 1
+
+        win_probability = node.win_probability
+        histogram[min(int(win_probability * WIN_PROBABILITY_BINS),
+                      WIN_PROBABILITY_BINS - 1)] += 1
+        win_total += win_probability
+
+    nodes = sum(nodes_per_depth)
+    parents = sum(parents_per_depth)
+    return {'nodes': nodes,
+            'nodes_per_depth': nodes_per_depth,
+            'leaves': leaves,
+            'branching_factor': sum(subtrees_per_depth) / parents if parents > 0 else 0.0,
+            'branching_factor_per_depth': [
+                subtrees / count if count > 0 else 0.0
+                for subtrees, count in zip(subtrees_per_depth, parents_per_depth)],
+            'win_probability_histogram': histogram.tolist(),
+            'mean_win_probability': win_total / nodes}
@@ -0,0 +1,171 @@
+"""CSC111 Winter 2021: Project Phase 2
+
+Copyright and Usage Information
+===============================
+
+This file is provided solely for the personal and private use of students and Faculty
+involved in CSC111 at the University of Toronto St. George campus. All forms of
+distribution of this code, whether as given or with any changes, are
+expressly prohibited.
+
+This file is Copyright (c) 2021 Shayaan Khan, Markus Nimi, Matthew Chan and Aabid Anas.
+
+A compact binary file format for trained game trees.
+
+A tree file starts with a 16 byte header:
+    - the magic bytes b'C3GT'
+    - the format version (uint16)
+    - the player_selection of the tree (uint8, 0 for 'Yellow' and 1 for 'Red')
+    - flags (uint8): FLAG_SYMMETRIC is set if the tree is mirror-symmetric
+    - the number of nodes (uint64)
+
+followed by one 24 byte record per node, with the root first:
+    - win_probability (float64)
+    - the index of the first subtree, or -1 (int32)
+    - the index of the next sibling, or -1 (int32)
+    - move (int8)
+    - is_yellow_move (int8)
+    - two padding bytes
+
+All values are little-endian. This is the same layout as a CompactTreeStorage, so a tree
+file can be memory-mapped and used as a read-only CompactGameTree without being parsed.
+"""
+from __future__ import annotations
+import mmap
+import struct
+from array import array
+from collections import deque
+from typing import Union
+
+import numpy as np
+
+import gametree
+
+MAGIC = b'C3GT'
+FORMAT_VERSION = 1
+PLAYER_SELECTIONS = ['Yellow', 'Red']
+
+FLAG_SYMMETRIC = 1
+
+HEADER = struct.Struct('<4sHBBQ')
+NODE = struct.Struct('<diibbxx')
+NODE_DTYPE = np.dtype([('win_probability', '<f8'), ('first_subtree', '<i4'),
+                       ('next_sibling', '<i4'), ('move', 'i1'), ('is_yellow_move', 'i1'),
+                       ('padding', 'V2')])
+
+# The number of node records written to the file at a time
+WRITE_BUFFER_NODES = 4096
+
+
+def save_game_tree(tree: Union[gametree.GameTree, gametree.CompactGameTree], path: str) -> int:
+    """Write the given tree to the file at path and return the number of nodes written.
+
+    The nodes are numbered and written in breadth-first order as they are visited, so the
+    whole file never has to be held in memory.
+
+    Preconditions:
+        - not tree.has_transpositions()
+    """
+    if tree.has_transpositions():
+        raise ValueError('Transposition-aware game trees cannot be saved')
+
+    flags = FLAG_SYMMETRIC if tree.is_symmetric() else 0
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION,
+                               PLAYER_SELECTIONS.index(tree.player_selection), flags, 0))
+
+        # Each entry is a node and the index of its next sibling
+        queue = deque([(tree, gametree.NO_NODE)])
+        next_index = 1
+        node_count = 0
+        buffer = bytearray()
+        while queue:
+            node, next_sibling = queue.popleft()
+            subtrees = node.get_subtrees()
+            if subtrees == []:
+                first_subtree = gametree.NO_NODE
+            else:
+                first_subtree = next_index
+                for i in range(len(subtrees)):
+                    is_last = i == len(subtrees) - 1
+                    queue.append((subtrees[i], gametree.NO_NODE if is_last else next_index + 1))
+                    next_index += 1
+
+            buffer += NODE.pack(node.win_probability, first_subtree, next_sibling, node.move,
+                                node.is_yellow_move)
+            node_count += 1
+            if node_count % WRITE_BUFFER_NODES == 0:
+                file.write(buffer)
+                buffer.clear()
+
+        file.write(buffer)
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION,
+                               PLAYER_SELECTIONS.index(tree.player_selection), flags, node_count))
+    return node_count
+
+
+def _read_header(header: bytes) -> tuple[str, bool, int]:
+    """Return the player_selection, whether the tree is mirror-symmetric and the number of
+    nodes of a tree file with the given header, or raise ValueError if it is not a supported
+    tree file.
+    """
+    if len(header) < HEADER.size:
+        raise ValueError('Not a game tree file')
+    magic, version, player_index, flags, node_count = HEADER.unpack_from(header)
+    if magic != MAGIC:
+        raise ValueError('Not a game tree file')
+    elif version != FORMAT_VERSION:
+        raise ValueError('Unsupported game tree file version: ' + str(version))
+    return PLAYER_SELECTIONS[player_index], bool(flags & FLAG_SYMMETRIC), node_count
+
+
+def open_compact_game_tree(path: str, writable: bool = False) -> gametree.CompactGameTree:
+    """Return the tree in the file at path as a CompactGameTree.
+
+    By default the file is memory-mapped and the tree is read-only, so opening it takes
+    constant time and its pages are only read from disk when they are used. If writable is
+    True, the nodes are copied into memory so that more games can be inserted.
+    """
+    with open(path, 'rb') as file:
+        player_selection, symmetric, node_count = _read_header(file.read(HEADER.size))
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    records = np.frombuffer(buffer, dtype=NODE_DTYPE, count=node_count, offset=HEADER.size)
+
+    storage = gametree.CompactTreeStorage(player_selection, symmetric)
+    if writable:
+        storage.moves = array('b', records['move'].tobytes())
+        storage.is_yellow_moves = array('b', records['is_yellow_move'].tobytes())
+        storage.win_probabilities = array('d', records['win_probability'].tobytes())
+        storage.first_subtrees = array('i', records['first_subtree'].astype(np.intc).tobytes())
+        storage.next_siblings = array('i', records['next_sibling'].astype(np.intc).tobytes())
+    else:
+        storage.moves = records['move']
+        storage.is_yellow_moves = records['is_yellow_move']
+        storage.win_probabilities = records['win_probability']
+        storage.first_subtrees = records['first_subtree']
+        storage.next_siblings = records['next_sibling']
+    return gametree.CompactGameTree(player_selection, storage)
+
+
+def load_game_tree(path: str) -> gametree.GameTree:
+    """Return the tree in the file at path as a GameTree."""
+    with open(path, 'rb') as file:
+        player_selection, symmetric, node_count = _read_header(file.read(HEADER.size))
+        data = file.read(node_count * NODE.size)
+    if len(data) < node_count * NODE.size:
+        raise ValueError('Truncated game tree file')
+
+    nodes = [gametree.GameTree(player_selection, move, bool(is_yellow_move), win_probability,
+                               symmetric=symmetric and index == 0)
+             for index, (win_probability, _, _, move, is_yellow_move)
+             in enumerate(NODE.iter_unpack(data))]
+
+    # Subtrees always come after their parent, so add them from the last node back to the
+    # root so that every subtree is complete before it is added
+    for index in range(node_count - 1, -1, -1):
+        subtree = NODE.unpack_from(data, index * NODE.size)[1]
+        while subtree != gametree.NO_NODE:
+            nodes[index].add_subtree(nodes[subtree])
+            subtree = NODE.unpack_from(data, subtree * NODE.size)[2]
+    return nodes[0]